@@ -0,0 +1,98 @@
+"""Central cache for images and sounds.
+
+Paths are resolved relative to this script rather than the working
+directory, so the game finds its files wherever it is launched from.
+preload() decodes files on a background thread while the menu is already
+on screen; image() and sound() return the cached object, and every file is
+loaded at most once.
+"""
+
+import os
+import threading
+
+import pygame
+
+from audio import load_sound
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class AssetManager:
+    def __init__(self, base_dir=SCRIPT_DIR):
+        self.base_dir = base_dir
+        self.cache = {}
+        self.loading = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def path(self, relative_path):
+        return os.path.join(self.base_dir, relative_path)
+
+    def _load(self, kind, relative_path):
+        path = self.path(relative_path)
+        if not os.path.isfile(path):
+            return None
+        try:
+            if kind == "image":
+                return pygame.image.load(path)
+            if pygame.mixer.get_init():
+                return load_sound(path)
+        except (pygame.error, OSError, ValueError) as e:
+            print(f"Failed loading {kind} '{path}': {e}")
+        return None
+
+    def get(self, kind, relative_path):
+        # The lock only guards the dicts; decoding happens outside it so the
+        # main thread is never stuck behind an unrelated file. A file that is
+        # already being loaded is waited for instead of decoded twice, and a
+        # missing or broken file is cached as None so it is not retried.
+        key = (kind, relative_path)
+        with self.lock:
+            if key in self.cache:
+                return self.cache[key]
+            done = self.loading.get(key)
+            owner = done is None
+            if owner:
+                done = self.loading[key] = threading.Event()
+        if not owner:
+            done.wait()
+            return self.cache.get(key)
+
+        asset = None
+        try:
+            asset = self._load(kind, relative_path)
+        finally:
+            # even if decoding blew up, so nobody waits on done forever
+            with self.lock:
+                self.cache[key] = asset
+                del self.loading[key]
+            done.set()
+        return asset
+
+    def peek(self, kind, relative_path):
+        """The cached asset, or None if it is not loaded (yet); never blocks."""
+        return self.cache.get((kind, relative_path))
+
+    def image(self, relative_path):
+        return self.get("image", relative_path)
+
+    def sound(self, relative_path):
+        return self.get("sound", relative_path)
+
+    def preload(self, images=(), sounds=()):
+        """Start decoding the given files on a background thread."""
+        items = [("image", p) for p in images] + [("sound", p) for p in sounds]
+
+        def work():
+            for kind, relative_path in items:
+                self.get(kind, relative_path)
+
+        self.thread = threading.Thread(target=work, name="asset-preload", daemon=True)
+        self.thread.start()
+
+    def wait(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+assets = AssetManager()
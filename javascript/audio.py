@@ -0,0 +1,122 @@
+"""Menu music and sound effects.
+
+The menu track is decoded once into a Sound and played on a reserved
+channel, so going back to the menu pauses and resumes it instead of
+re-opening and re-decoding the MP3. Effects get their own reserved
+channels and never steal the music's.
+
+Decoding an MP3 takes tens of milliseconds; load_sound() writes the decoded
+samples to a WAV file in a cache directory the first time and loads that on
+later runs, which is close to a plain file read.
+"""
+
+import os
+import wave
+
+import pygame
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOUND_CACHE_DIR = os.path.join(SCRIPT_DIR, ".audio-cache")
+
+MUSIC_CHANNEL = 0
+EFFECT_CHANNELS = 2
+MUSIC_FADE_MS = 400
+
+
+def cached_wav_path(path, cache_dir, mixer_format):
+    # keyed on the source file and mixer format, so an edited file or a
+    # different output format gets a fresh transcode
+    stat = os.stat(path)
+    frequency, size, channels = mixer_format
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{stat.st_size}-{stat.st_mtime_ns}-{frequency}-{size}-{channels}.wav")
+
+
+def load_sound(path, cache_dir=SOUND_CACHE_DIR):
+    """Load path as a Sound, going through the decoded WAV cache when possible."""
+    mixer_format = pygame.mixer.get_init()
+    # WAV holds unsigned 8-bit or signed 16-bit PCM; other mixer formats
+    # (and WAV sources) are loaded directly
+    if cache_dir is None or path.lower().endswith(".wav") or mixer_format[1] not in (8, -16):
+        return pygame.mixer.Sound(path)
+
+    wav_path = cached_wav_path(path, cache_dir, mixer_format)
+    if os.path.isfile(wav_path):
+        try:
+            return pygame.mixer.Sound(wav_path)
+        except pygame.error:
+            pass
+
+    sound = pygame.mixer.Sound(path)
+    frequency, size, channels = mixer_format
+    tmp = wav_path + f".tmp{os.getpid()}"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with wave.open(tmp, "wb") as f:
+            f.setnchannels(channels)
+            f.setsampwidth(abs(size) // 8)
+            f.setframerate(frequency)
+            f.writeframes(sound.get_raw())
+        os.replace(tmp, wav_path)
+    except OSError:
+        # a read-only install still plays, it just decodes every time
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return sound
+
+
+class AudioManager:
+    def __init__(self, assets, music=None):
+        self.assets = assets
+        self.music = music
+        self.music_channel = None
+        self.effect_channels = []
+        self.next_effect = 0
+        self.music_started = False
+        self.music_paused = False
+        if pygame.mixer.get_init():
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), 1 + EFFECT_CHANNELS + 4))
+            pygame.mixer.set_reserved(1 + EFFECT_CHANNELS)
+            self.music_channel = pygame.mixer.Channel(MUSIC_CHANNEL)
+            self.effect_channels = [pygame.mixer.Channel(MUSIC_CHANNEL + 1 + i) for i in range(EFFECT_CHANNELS)]
+
+    def update(self, music_wanted):
+        """Called once per frame; starts, pauses or resumes the menu music.
+
+        Never blocks: if the track is still being decoded in the background
+        it simply starts on a later frame.
+        """
+        channel = self.music_channel
+        if channel is None or not self.music:
+            return
+        if not music_wanted:
+            if self.music_started and not self.music_paused:
+                channel.pause()
+                self.music_paused = True
+            return
+        if self.music_paused:
+            channel.unpause()
+            self.music_paused = False
+        elif not self.music_started:
+            sound = self.assets.peek("sound", self.music)
+            if sound is not None:
+                channel.play(sound, loops=-1, fade_ms=MUSIC_FADE_MS)
+                self.music_started = True
+
+    @property
+    def music_playing(self):
+        return self.music_started and not self.music_paused
+
+    def play_effect(self, relative_path):
+        """Play a sound effect on the next effect channel; skipped if not loaded yet."""
+        if not self.effect_channels:
+            return False
+        sound = self.assets.peek("sound", relative_path)
+        if sound is None:
+            return False
+        channel = self.effect_channels[self.next_effect]
+        self.next_effect = (self.next_effect + 1) % len(self.effect_channels)
+        channel.play(sound)
+        return True
@@ -0,0 +1,136 @@
+"""Many Sokoban boards stepped at once with NumPy.
+
+BatchEnv holds N boards, copies of one level or a mix, as one flat uint8
+array of board.py cell flags. Every board is padded to the same bordered
+grid, so a cell index plus env * size addresses any cell of any board.
+step() applies one action per board with a fixed handful of vectorized
+array operations. The moves are exactly Board.move: walls block, a box is
+pushed if the cell beyond it is free, and a level is solved when every
+target has a box.
+
+    env = BatchEnv.from_levels(LEVELS, 4096)
+    obs = env.reset()
+    obs, rewards, dones, info = env.step(actions)   # actions: N ints, 0-3
+
+Actions are the board.DIRECTIONS codes (up, down, left, right).
+Observations are the cell flags, shape (N, rows, columns), with PLAYER
+set on the player's cell. Boards that finish are reset automatically;
+info["solved"] and info["truncated"] say why they ended.
+
+NumPy is only needed for this module; the game itself does not use it.
+"""
+
+import numpy as np
+
+from board import BOX, TARGET, WALL, Board, DIRECTIONS
+from levels import LEVELS
+
+PLAYER = 8
+
+STEP_REWARD = -0.1
+BOX_ON_TARGET_REWARD = 1.0
+SOLVED_REWARD = 10.0
+
+
+class BatchEnv:
+    def __init__(self, layouts, max_steps=200, autoreset=True):
+        boards = [Board(layout) for layout in layouts]
+        if not boards:
+            raise ValueError("need at least one layout")
+        self.count = len(boards)
+        self.rows = max(board.height for board in boards) + 2
+        self.stride = max(board.width for board in boards) + 2
+        self.size = self.rows * self.stride
+        self.max_steps = max_steps
+        self.autoreset = autoreset
+
+        # pad every bordered board into the common grid, outside being wall
+        initial = np.full((self.count, self.rows, self.stride), WALL, dtype=np.uint8)
+        start = np.empty(self.count, dtype=np.intp)
+        self.target_counts = np.empty(self.count, dtype=np.int32)
+        self.initial_on_target = np.empty(self.count, dtype=np.int32)
+        for i, board in enumerate(boards):
+            grid = np.frombuffer(bytes(board.cells), dtype=np.uint8).reshape(board.height + 2, board.stride)
+            initial[i, :board.height + 2, :board.stride] = grid
+            y, x = divmod(board.player, board.stride)
+            start[i] = i * self.size + y * self.stride + x
+            self.target_counts[i] = len(board.targets)
+            self.initial_on_target[i] = board.on_target
+        self.initial = initial.reshape(-1)
+        self.start = start
+        self.deltas = np.array([dx + dy * self.stride for dx, dy in DIRECTIONS], dtype=np.intp)
+
+        self.cells = self.initial.copy()
+        self.player = start.copy()
+        self.on_target = self.initial_on_target.copy()
+        self.steps = np.zeros(self.count, dtype=np.int32)
+
+    @classmethod
+    def from_levels(cls, levels=None, count=1, **kwargs):
+        """count boards cycling through levels (default: the shipped LEVELS)."""
+        levels = LEVELS if levels is None else levels
+        return cls([levels[i % len(levels)]["layout"] for i in range(count)], **kwargs)
+
+    def reset(self, which=None):
+        """Put all boards (or the ones selected by index or mask) back at their start."""
+        if which is None:
+            self.cells[:] = self.initial
+            self.player[:] = self.start
+            self.on_target[:] = self.initial_on_target
+            self.steps[:] = 0
+        else:
+            rows = self.cells.reshape(self.count, self.size)
+            rows[which] = self.initial.reshape(self.count, self.size)[which]
+            self.player[which] = self.start[which]
+            self.on_target[which] = self.initial_on_target[which]
+            self.steps[which] = 0
+        return self.observation()
+
+    def observation(self):
+        obs = self.cells.copy()
+        obs[self.player] |= PLAYER
+        return obs.reshape(self.count, self.rows, self.stride)
+
+    def solved(self):
+        return self.on_target == self.target_counts
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.intp)
+        cells = self.cells
+        d = self.deltas[actions]
+        dest = self.player + d
+        beyond = dest + d
+        dest_flags = cells[dest]
+        # beyond can leave the array only when dest is border wall, and
+        # then it is never used
+        beyond_flags = cells.take(beyond, mode="clip")
+
+        has_box = (dest_flags & BOX) != 0
+        push = has_box & ((beyond_flags & (WALL | BOX)) == 0)
+        move = ((dest_flags & WALL) == 0) & (~has_box | push)
+
+        src = dest[push]
+        dst = beyond[push]
+        cells[src] = dest_flags[push] & (0xFF ^ BOX)
+        cells[dst] = beyond_flags[push] | BOX
+        gained = (beyond_flags[push] & TARGET != 0).astype(np.int32) - (dest_flags[push] & TARGET != 0)
+        change = np.zeros(self.count, dtype=np.int32)
+        change[push] = gained
+        self.on_target += change
+        self.player = np.where(move, dest, self.player)
+        self.steps += 1
+
+        solved = self.solved()
+        truncated = (self.steps >= self.max_steps) & ~solved
+        dones = solved | truncated
+        rewards = STEP_REWARD + BOX_ON_TARGET_REWARD * change + SOLVED_REWARD * solved
+        info = {"solved": solved, "truncated": truncated, "moved": move, "pushed": push}
+        if self.autoreset and dones.any():
+            self.reset(dones)
+        return self.observation(), rewards, dones, info
+
+    def player_xy(self):
+        """(N, 2) array of player (x, y) in layout coordinates."""
+        local = self.player - np.arange(self.count) * self.size
+        y, x = np.divmod(local, self.stride)
+        return np.stack((x - 1, y - 1), axis=1)
@@ -0,0 +1,269 @@
+"""Headless benchmarks for the game logic and rendering hot paths.
+
+Runs with SDL's dummy video driver, so no window is opened. Moves are
+replayed from fixed scripts (solver solutions for the shipped LEVELS and a
+seeded random walk on a generated 100x100 board with 500 boxes), so runs
+are comparable between commits. The circuit benchmark toggles seeded random
+inputs of a 100,000-gate bank of 32-bit ripple-carry adders.
+
+Usage:
+    python bench.py -o results.json
+    python bench.py --save-baseline baseline.json
+    python bench.py --baseline baseline.json --threshold 0.25
+
+Each result is the best per-call time in seconds over several rounds. With
+--baseline the run fails (exit status 1) if any benchmark got slower than
+the baseline by more than the threshold.
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import pygame
+
+import logicgames
+from board import DIRECTIONS, DIRECTION_CHARS
+from circuit import Circuit, Simulator
+from levels import LEVELS
+from solver import solve
+from textcache import wrap_text
+
+try:
+    from batchenv import BatchEnv
+except ImportError:
+    # NumPy is optional; without it the batch benchmark is skipped
+    BatchEnv = None
+
+
+def measure(fn, number, rounds=5):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def large_layout(width=100, height=100, boxes=500, seed=1):
+    rng = random.Random(seed)
+    grid = [["#" if x in (0, width - 1) or y in (0, height - 1) else " " for x in range(width)]
+            for y in range(height)]
+    floor = [(x, y) for y in range(1, height - 1) for x in range(1, width - 1)]
+    rng.shuffle(floor)
+    for x, y in floor[:len(floor) // 12]:
+        grid[y][x] = "#"
+    free = floor[len(floor) // 12:]
+    for x, y in free[:boxes]:
+        grid[y][x] = "$"
+    for x, y in free[boxes:boxes * 2]:
+        grid[y][x] = "."
+    px, py = free[boxes * 2]
+    grid[py][px] = "@"
+    return ["".join(row) for row in grid]
+
+
+def adder_bank(gate_count=100_000, bits=32):
+    # independent ripple-carry adders until the circuit has gate_count gates
+    circuit = Circuit()
+    while len(circuit.gate_kinds) < gate_count:
+        carry = None
+        for _ in range(bits):
+            a = circuit.add_input()
+            b = circuit.add_input()
+            if carry is None:
+                circuit.add_gate("XOR", (a, b))
+                carry = circuit.add_gate("AND", (a, b))
+                continue
+            circuit.add_gate("XOR", (a, b, carry))
+            half = circuit.add_gate("XOR", (a, b))
+            carry = circuit.add_gate("OR", (circuit.add_gate("AND", (a, b)), circuit.add_gate("AND", (carry, half))))
+    return circuit
+
+
+def scripted_moves(levels):
+    # one solution per level as (dx, dy) steps, the same every run
+    scripts = []
+    for level in levels:
+        solution = solve(level["layout"]).solution
+        scripts.append([DIRECTIONS[DIRECTION_CHARS.index(c.lower())] for c in solution])
+    return scripts
+
+
+def bench_logic(results):
+    scripts = scripted_moves(LEVELS)
+    games = [logicgames.SokobanGame(i) for i in range(len(LEVELS))]
+    total_moves = sum(len(s) for s in scripts)
+
+    def play_all():
+        for game, script in zip(games, scripts):
+            game.restart()
+            for dx, dy in script:
+                game.move_player(dx, dy)
+            game.check_win()
+
+    results["levels.solution_replay_per_move"] = measure(play_all, 20) / total_moves
+    results["levels.check_win"] = measure(games[5].check_win, 20000)
+
+    big = {"name": "Generated 100x100", "layout": large_layout(), "gate": "AND"}
+    game = logicgames.SokobanGame(0, [big])
+    rng = random.Random(7)
+    walk = [rng.choice(DIRECTIONS) for _ in range(5000)]
+
+    def random_walk():
+        game.restart()
+        for dx, dy in walk:
+            game.move_player(dx, dy)
+
+    results["large.move_player"] = measure(random_walk, 3) / len(walk)
+    results["large.check_win"] = measure(game.check_win, 20000)
+    results["large.undo_redo"] = measure(lambda: (game.undo(), game.redo()), 20000)
+    return game
+
+
+def bench_circuit(results):
+    circuit = adder_bank()
+    results["circuit.simulator_init"] = measure(lambda: Simulator(circuit), 1, rounds=3)
+    simulator = Simulator(circuit)
+    rng = random.Random(5)
+    toggles = [rng.choice(circuit.inputs) for _ in range(5000)]
+
+    def toggle_all():
+        for net in toggles:
+            simulator.toggle(net)
+
+    results["circuit.toggle"] = measure(toggle_all, 1) / len(toggles)
+
+
+def bench_batchenv(results, count=4096):
+    import numpy as np
+
+    env = BatchEnv.from_levels(LEVELS, count)
+    actions = np.random.default_rng(9).integers(0, 4, (50, count))
+
+    def run_steps():
+        for batch in actions:
+            env.step(batch)
+
+    results["batchenv.step_per_board"] = measure(run_steps, 1) / (len(actions) * count)
+
+
+def bench_rendering(results, large_game):
+    surface = logicgames.init_display()
+    game = logicgames.Game()
+
+    for state in ("menu", "level_select", "lessons", "victory"):
+        game.state = state
+        results[f"screen.{state}"] = measure(game.draw, 200)
+
+    game.lesson_screen = logicgames.LessonScreen("XOR")
+    game.state = "lesson_view"
+    results["screen.lesson_view"] = measure(game.draw, 200)
+
+    random.seed(3)
+    game.quiz_screen = logicgames.QuizScreen("AND")
+    game.state = "quiz"
+    results["screen.quiz"] = measure(game.draw, 200)
+
+    huge = {"name": "Generated 200x200", "layout": large_layout(200, 200, 2000), "gate": "AND"}
+    boards = (
+        ("playing", logicgames.SokobanGame(6)),
+        ("playing_large", large_game),
+        ("playing_huge", logicgames.SokobanGame(0, [huge])),
+    )
+    for name, sokoban in boards:
+        def full_draw():
+            sokoban.full_redraw = True
+            sokoban.draw(surface)
+
+        def step_draw():
+            for dx, dy in DIRECTIONS:
+                if sokoban.move_player(dx, dy):
+                    break
+            sokoban.draw(surface)
+            sokoban.undo()
+            sokoban.draw(surface)
+
+        sokoban.draw(surface)
+        results[f"screen.{name}.full"] = measure(full_draw, 50)
+        results[f"screen.{name}.move"] = measure(step_draw, 500)
+        results[f"screen.{name}.idle"] = measure(lambda: sokoban.draw(surface), 2000)
+
+    button = game.play_btn
+    results["button.draw"] = measure(lambda: button.draw(surface), 2000)
+
+    description = logicgames.LOGIC_GATES["XOR"]["description"]
+    font = logicgames.font_small
+    results["wrap_text.cached"] = measure(lambda: wrap_text(description, font, 700), 5000)
+    results["wrap_text.uncached"] = measure(lambda: wrap_text.__wrapped__(description, font, 700), 500)
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, value in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = value / base
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:40s} {base * 1e6:12.2f} us -> {value * 1e6:12.2f} us  x{ratio:.2f}{marker}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark game logic and rendering.")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--save-baseline", help="write results to this file as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before failing, as a fraction (default 0.25)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    large_game = bench_logic(results)
+    bench_circuit(results)
+    if BatchEnv is not None:
+        bench_batchenv(results)
+    bench_rendering(results, large_game)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    elif not args.output and not args.save_baseline:
+        for name, value in sorted(results.items()):
+            print(f"{name:40s} {value * 1e6:12.2f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
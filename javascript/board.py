@@ -0,0 +1,147 @@
+"""Compact Sokoban board state shared by the game, solvers and batch tools.
+
+The grid is stored as a flat bytearray of cell flags with a one-cell wall
+border, so every neighbour lookup is a single index add and never needs a
+bounds check. Boxes are tracked both in the grid (BOX flag) and in a
+cell -> box index map, which keeps moves, box lookups and win checks O(1).
+"""
+
+import hashlib
+
+WALL = 1
+TARGET = 2
+BOX = 4
+
+# Direction codes shared by move logs, replays and solvers: up, down, left, right.
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+DIRECTION_CHARS = "udlr"
+PUSHED = 4
+
+
+class Board:
+    def __init__(self, layout):
+        rows = [str(row) for row in layout]
+        self.height = len(rows)
+        self.width = max(len(row) for row in rows) if rows else 0
+        self.stride = self.width + 2
+
+        # Anything outside the layout (border and short rows) is wall, just
+        # like the original out-of-bounds check in SokobanGame.is_wall.
+        self.cells = bytearray([WALL]) * (self.stride * (self.height + 2))
+        self.player = None
+        self.box_cells = []
+        self.box_at = {}
+        self.targets = []
+
+        for y, row in enumerate(rows):
+            for x, cell in enumerate(row):
+                i = self.index(x, y)
+                if cell == '#':
+                    continue
+                flags = 0
+                if cell in '.*+':
+                    flags |= TARGET
+                    self.targets.append(i)
+                if cell in '$*':
+                    flags |= BOX
+                    self.box_at[i] = len(self.box_cells)
+                    self.box_cells.append(i)
+                if cell in '@+':
+                    self.player = i
+                self.cells[i] = flags
+
+        self.deltas = tuple(dx + dy * self.stride for dx, dy in DIRECTIONS)
+        self.on_target = sum(1 for i in self.box_cells if self.cells[i] & TARGET)
+
+    def index(self, x, y):
+        return (y + 1) * self.stride + (x + 1)
+
+    def xy(self, i):
+        y, x = divmod(i, self.stride)
+        return x - 1, y - 1
+
+    def is_wall(self, x, y):
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return True
+        return self.cells[self.index(x, y)] & WALL != 0
+
+    def is_box(self, x, y):
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return False
+        return self.cells[self.index(x, y)] & BOX != 0
+
+    def is_solved(self):
+        return self.on_target == len(self.targets)
+
+    def move_box(self, src, dst):
+        cells = self.cells
+        cells[src] &= ~BOX
+        cells[dst] |= BOX
+        box = self.box_at.pop(src)
+        self.box_at[dst] = box
+        self.box_cells[box] = dst
+        self.on_target += (cells[dst] & TARGET != 0) - (cells[src] & TARGET != 0)
+
+    def snapshot(self):
+        """Immutable copy of the dynamic state, for restarts and solvers."""
+        return bytes(self.cells), self.player, tuple(self.box_cells), self.on_target
+
+    def restore(self, snapshot):
+        cells, self.player, box_cells, self.on_target = snapshot
+        self.cells[:] = cells
+        self.box_cells = list(box_cells)
+        self.box_at = {cell: i for i, cell in enumerate(box_cells)}
+
+    def move(self, direction):
+        """Try to move the player; returns 0 if blocked, 1 for a step, 2 for a push."""
+        d = self.deltas[direction]
+        cells = self.cells
+        dest = self.player + d
+        flags = cells[dest]
+        if flags & WALL:
+            return 0
+        if flags & BOX:
+            beyond = dest + d
+            if cells[beyond] & (WALL | BOX):
+                return 0
+            self.move_box(dest, beyond)
+            self.player = dest
+            return 2
+        self.player = dest
+        return 1
+
+    def undo(self, code):
+        """Reverse a move recorded as direction | PUSHED by move_code."""
+        d = self.deltas[code & 3]
+        player = self.player
+        if code & PUSHED:
+            self.move_box(player + d, player)
+        self.player = player - d
+
+
+def layout_problem(layout):
+    """Why a layout cannot be played, or None if it can."""
+    if isinstance(layout, str) or not isinstance(layout, (list, tuple)) or not layout:
+        return "layout must be a non-empty list of rows"
+    if not all(isinstance(row, str) for row in layout):
+        return "layout rows must be strings"
+    players = sum(row.count("@") + row.count("+") for row in layout)
+    if players != 1:
+        return "no player" if players == 0 else f"{players} players"
+    targets = sum(row.count(".") + row.count("*") + row.count("+") for row in layout)
+    boxes = sum(row.count("$") + row.count("*") for row in layout)
+    if not targets:
+        return "no targets"
+    if boxes < targets:
+        return f"{boxes} boxes for {targets} targets"
+    return None
+
+
+def layout_hash(layout):
+    # Stable 8-byte fingerprint of a level's layout strings.
+    return hashlib.blake2b("\n".join(layout).encode("utf-8"), digest_size=8).digest()
+
+
+def move_code(direction, result):
+    # One byte per move in undo logs and replays: direction plus a pushed bit.
+    return direction | PUSHED if result == 2 else direction
@@ -0,0 +1,217 @@
+"""Event-driven simulation of gate circuits.
+
+Build a circuit with Circuit (inputs, then gates that each drive one new
+net), then hand it to Simulator. The simulator keeps everything in flat
+arrays: net values, gate kinds, and the fanout of every net in CSR form
+(fanout_start[net]..fanout_start[net + 1] index into fanout_gates).
+
+Every gate in gates.GATES is symmetric, so its output only depends on how
+many of its inputs are 1. Each gate keeps that count, and a lookup table
+built from the gates.GATES functions maps count to output. When a net
+changes, only the gates it feeds get their count adjusted and are queued.
+A queued gate is evaluated in O(1), and only a changed output spreads
+further. Nothing else in the circuit is touched.
+
+Nothing here imports pygame, so it runs headless in tests and benchmarks.
+"""
+
+from array import array
+from collections import deque
+
+from gates import GATES, parse
+
+# propagate() without a budget gives up after this many evaluations per
+# gate; an acyclic circuit settles long before, so a circuit still busy by
+# then has a feedback loop that oscillates
+OSCILLATION_LIMIT = 64
+
+
+class Circuit:
+    def __init__(self):
+        self.net_count = 0
+        self.names = {}
+        self.inputs = []
+        self.gate_kinds = []
+        self.gate_inputs = []
+        self.gate_outputs = []
+
+    def _new_net(self, name=None):
+        net = self.net_count
+        self.net_count += 1
+        if name is not None:
+            self.names[name] = net
+        return net
+
+    def add_input(self, name=None):
+        net = self._new_net(name)
+        self.inputs.append(net)
+        return net
+
+    def add_gate(self, kind, inputs, name=None):
+        """Add a gate reading the given nets; returns the net it drives."""
+        if kind not in GATES:
+            raise ValueError(f"unknown gate {kind!r}")
+        if not inputs or (kind == "NOT" and len(inputs) != 1):
+            raise ValueError(f"wrong number of inputs for {kind}")
+        for net in inputs:
+            if not 0 <= net < self.net_count:
+                raise ValueError(f"no such net {net}")
+        out = self._new_net(name)
+        self.gate_kinds.append(kind)
+        self.gate_inputs.append(tuple(inputs))
+        self.gate_outputs.append(out)
+        return out
+
+    def connect(self, gate, index, net):
+        """Rewire one gate input; this is how feedback loops are made."""
+        inputs = list(self.gate_inputs[gate])
+        inputs[index] = net
+        self.gate_inputs[gate] = tuple(inputs)
+
+    @classmethod
+    def from_expression(cls, expression):
+        """A circuit computing an expression in the gates.parse syntax; the output net is named "Y"."""
+        variables, tree = parse(expression)
+        circuit = cls()
+        nets = {name: circuit.add_input(name) for name in variables}
+
+        def build(node):
+            kind, value = node
+            if kind == "var":
+                return nets[value]
+            if kind == "const":
+                # 1 = NOT(x) OR x, 0 = its negation, from the first input
+                x = nets[variables[0]] if variables else circuit.add_input()
+                one = circuit.add_gate("OR", (x, circuit.add_gate("NOT", (x,))))
+                return one if value else circuit.add_gate("NOT", (one,))
+            return circuit.add_gate(kind, tuple(build(arg) for arg in value))
+
+        circuit.names["Y"] = build(tree)
+        return circuit
+
+
+def _count_table(kind, arity):
+    # output for 0..arity inputs set, straight from the gate definition
+    return bytes(GATES[kind](1, *([1] * ones + [0] * (arity - ones))) for ones in range(arity + 1))
+
+
+class Simulator:
+    def __init__(self, circuit):
+        self.names = dict(circuit.names)
+        self.inputs = list(circuit.inputs)
+        gate_count = len(circuit.gate_kinds)
+        net_count = circuit.net_count
+        self.values = bytearray(net_count)
+        self.driver = array("i", [-1]) * net_count
+        self.gate_outputs = array("i", circuit.gate_outputs)
+        self.ones = array("i", bytes(4 * gate_count))
+
+        # per-gate output lookup, indexed by lut_start[gate] + ones[gate]
+        tables = {}
+        lut = bytearray()
+        self.lut_start = array("i", bytes(4 * gate_count))
+        for gate, (kind, inputs) in enumerate(zip(circuit.gate_kinds, circuit.gate_inputs)):
+            key = (kind, len(inputs))
+            if key not in tables:
+                tables[key] = len(lut)
+                lut += _count_table(kind, len(inputs))
+            self.lut_start[gate] = tables[key]
+            self.driver[circuit.gate_outputs[gate]] = gate
+        self.lut = bytes(lut)
+
+        fanout = [0] * (net_count + 1)
+        for inputs in circuit.gate_inputs:
+            for net in inputs:
+                fanout[net + 1] += 1
+        for net in range(net_count):
+            fanout[net + 1] += fanout[net]
+        self.fanout_start = array("i", fanout)
+        self.fanout_gates = array("i", bytes(4 * fanout[-1]))
+        fill = fanout[:-1]
+        for gate, inputs in enumerate(circuit.gate_inputs):
+            for net in inputs:
+                self.fanout_gates[fill[net]] = gate
+                fill[net] += 1
+
+        self.queue = deque()
+        self.queued = bytearray(gate_count)
+        self.evaluations = 0
+        # all nets start at 0; evaluate every gate once so NOT/NAND/NOR/XNOR
+        # outputs come up as 1
+        for gate in range(gate_count):
+            self._enqueue(gate)
+        self.propagate()
+
+    def _enqueue(self, gate):
+        if not self.queued[gate]:
+            self.queued[gate] = 1
+            self.queue.append(gate)
+
+    def _set_net(self, net, value):
+        self.values[net] = value
+        step = 1 if value else -1
+        ones = self.ones
+        queued = self.queued
+        queue = self.queue
+        fanout_gates = self.fanout_gates
+        for i in range(self.fanout_start[net], self.fanout_start[net + 1]):
+            gate = fanout_gates[i]
+            ones[gate] += step
+            if not queued[gate]:
+                queued[gate] = 1
+                queue.append(gate)
+
+    def set_input(self, net, value):
+        """Drive an input net; call propagate() to let the change spread."""
+        if isinstance(net, str):
+            net = self.names[net]
+        if self.driver[net] != -1:
+            raise ValueError(f"net {net} is driven by a gate")
+        value = 1 if value else 0
+        if self.values[net] != value:
+            self._set_net(net, value)
+
+    def toggle(self, net, max_events=None):
+        if isinstance(net, str):
+            net = self.names[net]
+        self.set_input(net, not self.values[net])
+        return self.propagate(max_events)
+
+    def propagate(self, max_events=None):
+        """Evaluate queued gates until nothing changes; returns True once settled.
+
+        With max_events the work stops after that many evaluations and the
+        rest stays queued, so a caller can spread a large change over
+        several frames. Without it, an oscillating circuit is stopped after
+        OSCILLATION_LIMIT evaluations per gate and False is returned.
+        """
+        queue = self.queue
+        queued = self.queued
+        values = self.values
+        ones = self.ones
+        lut = self.lut
+        lut_start = self.lut_start
+        gate_outputs = self.gate_outputs
+        set_net = self._set_net
+        if max_events is None:
+            max_events = OSCILLATION_LIMIT * (len(queued) + 1)
+        budget = max_events
+        while queue and budget:
+            budget -= 1
+            gate = queue.popleft()
+            queued[gate] = 0
+            self.evaluations += 1
+            out = gate_outputs[gate]
+            value = lut[lut_start[gate] + ones[gate]]
+            if values[out] != value:
+                set_net(out, value)
+        return not queue
+
+    @property
+    def settled(self):
+        return not self.queue
+
+    def value(self, net):
+        if isinstance(net, str):
+            net = self.names[net]
+        return self.values[net]
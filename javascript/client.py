@@ -0,0 +1,228 @@
+"""Thin client for server.py.
+
+The server owns the game; this window sends key presses and follows the
+deltas that come back, replaying them on a local SokobanGame so drawing
+works exactly as in the standalone game. Quiz answers are checked by the
+server. Hints are worked out locally by hints.HintEngine, like in the
+standalone game.
+
+Usage:
+    python client.py --name Ana
+    python client.py --host 192.168.1.10 --port 8765 --level 3
+"""
+
+import argparse
+import json
+import socket
+import sys
+import threading
+
+import pygame
+
+import logicgames
+from board import DIRECTIONS
+from hints import HintEngine
+from logicgames import QuizScreen, SokobanGame
+from server import DEFAULT_HOST, DEFAULT_PORT, encode
+from textcache import render_text
+
+SERVER_MESSAGE = pygame.USEREVENT + 1
+MOVE_KEYS = {pygame.K_UP: 0, pygame.K_DOWN: 1, pygame.K_LEFT: 2, pygame.K_RIGHT: 3}
+
+
+class Connection:
+    """A line-based socket whose incoming messages arrive as pygame events."""
+
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile("rb")
+        # the reader thread only posts events; all game state stays on
+        # the main thread
+        self.thread = threading.Thread(target=self._read, name="server-reader", daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        try:
+            for line in self.file:
+                pygame.event.post(pygame.event.Event(SERVER_MESSAGE, message=json.loads(line)))
+        except (OSError, ValueError):
+            pass
+        pygame.event.post(pygame.event.Event(SERVER_MESSAGE, message={"type": "closed"}))
+
+    def send(self, message):
+        try:
+            self.sock.sendall(encode(message))
+        except OSError:
+            pass
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class Client:
+    def __init__(self, connection, name, level=0):
+        self.connection = connection
+        self.name = name
+        self.first_level = level
+        self.game = None
+        self.hints = None
+        self.quiz = None
+        # the next level arrives with the quiz result but is only shown
+        # after the student clicks Continue
+        self.next_level = None
+        self.notice = "Connecting..."
+        self.running = True
+
+    def run(self):
+        screen = logicgames.init_display()
+        pygame.display.set_caption(f"Logic Gates Adventure - {self.name}")
+        self.connection.send({"type": "hello", "name": self.name})
+        self.connection.send({"type": "start", "level": self.first_level})
+        while self.running:
+            for event in [pygame.event.wait()] + pygame.event.get():
+                self.handle_event(event)
+            self.draw(screen)
+        self.stop_hints()
+        self.connection.close()
+        pygame.quit()
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == SERVER_MESSAGE:
+            self.handle_message(event.message)
+        elif self.quiz is not None:
+            self.handle_quiz_event(event)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+            elif self.game is None:
+                return
+            elif event.key in MOVE_KEYS:
+                self.connection.send({"type": "move", "dir": MOVE_KEYS[event.key]})
+            elif event.key == pygame.K_z or event.key == pygame.K_BACKSPACE:
+                self.connection.send({"type": "undo"})
+            elif event.key == pygame.K_y:
+                self.connection.send({"type": "redo"})
+            elif event.key == pygame.K_r:
+                self.connection.send({"type": "restart"})
+            elif event.key == pygame.K_h:
+                self.game.show_hint(self.hints.hint(self.game.board))
+
+    def handle_quiz_event(self, event):
+        quiz = self.quiz
+        if not quiz.answered:
+            for i, btn in enumerate(quiz.option_buttons):
+                if btn.handle_event(event) and quiz.selected_answer is None:
+                    quiz.selected_answer = quiz.question_data["options"][i]
+                    self.connection.send({"type": "answer", "choice": quiz.selected_answer})
+        elif quiz.continue_btn.handle_event(event):
+            self.quiz = None
+            if self.next_level is not None:
+                self.load_level(self.next_level)
+                self.next_level = None
+
+    def handle_message(self, message):
+        kind = message.get("type")
+        if kind == "delta":
+            self.apply_delta(message)
+        elif kind == "level":
+            if self.quiz is not None:
+                self.next_level = message
+            else:
+                self.load_level(message)
+        elif kind == "quiz":
+            self.stop_hints()
+            question = {"question": message["question"], "options": message["options"], "answer": None}
+            self.quiz = QuizScreen(message["gate"], question_data=question)
+        elif kind == "result":
+            self.quiz.answered = True
+            self.quiz.correct = message["correct"]
+            self.quiz.question_data["answer"] = message["answer"]
+        elif kind == "finished":
+            self.game = None
+            self.notice = f"All done! {message['completed']} levels completed."
+        elif kind == "closed":
+            self.game = None
+            self.quiz = None
+            self.notice = "Lost the connection to the server."
+        elif kind == "error":
+            print(f"server: {message.get('error')}", file=sys.stderr)
+
+    def load_level(self, message):
+        level = {"name": message["name"], "layout": message["layout"], "gate": message["gate"]}
+        self.game = SokobanGame(0, [level])
+        # a sync reply carries the moves made so far
+        for code in bytes.fromhex(message.get("history", "")):
+            self.game.apply_move(code & 3)
+        self.stop_hints()
+        self.hints = HintEngine(level["layout"])
+        self.hints.update(self.game.board)
+
+    def apply_delta(self, message):
+        game = self.game
+        op = message["op"]
+        if game is None or op == "none":
+            return
+        if op == "move":
+            game.move_player(*DIRECTIONS[message["code"] & 3])
+        elif op == "redo":
+            game.redo()
+        elif op == "undo":
+            game.undo()
+        elif op == "restart":
+            game.restart()
+        if game.moves != message["moves"] or ("code" in message and game.history[-1] != message["code"]):
+            # out of step with the server; get the whole position again
+            self.connection.send({"type": "sync"})
+            return
+        if self.hints is not None:
+            self.hints.update(game.board)
+        if game.hint_message is not None and not game.hint_applies():
+            game.hide_hint()
+
+    def stop_hints(self):
+        if self.hints is not None:
+            self.hints.close()
+            self.hints = None
+
+    def draw(self, screen):
+        if self.quiz is not None:
+            self.quiz.draw(screen)
+            pygame.display.flip()
+        elif self.game is not None:
+            rects = self.game.draw(screen)
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+        else:
+            screen.fill(logicgames.DARK_GRAY)
+            text = render_text(logicgames.font_medium, self.notice, True, logicgames.WHITE)
+            screen.blit(text, (logicgames.SCREEN_WIDTH // 2 - text.get_width() // 2, logicgames.SCREEN_HEIGHT // 2))
+            pygame.display.flip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play on a classroom server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--name", default="student")
+    parser.add_argument("--level", type=int, default=1, help="1-based level to start on")
+    args = parser.parse_args(argv)
+
+    try:
+        connection = Connection(args.host, args.port)
+    except OSError as e:
+        print(f"cannot reach {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+    Client(connection, args.name, args.level - 1).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
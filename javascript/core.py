@@ -0,0 +1,168 @@
+"""The game rules without any pygame.
+
+Level parsing, moves, undo/redo, win and deadlock detection, and the gate
+lessons' data. Nothing here imports pygame, so it loads in a few
+milliseconds and works in worker processes, tests and servers without a
+display. logicgames.SokobanGame adds the rendering on top.
+"""
+
+from board import Board, DIRECTIONS, PUSHED, move_code
+from deadlock import deadlock_tables
+from gates import gate_truth_table
+from levels import LEVELS
+
+LOGIC_GATES = {
+    "AND": {
+        "name": "AND Gate",
+        "symbol": "A AND B = Y",
+        "description": "The AND gate outputs TRUE (1) only when ALL inputs are TRUE (1). If any input is FALSE (0), the output is FALSE (0).",
+        "truth_table": gate_truth_table("AND"),
+        "real_world": "Like a security door that needs BOTH a key card AND a PIN code to open."
+    },
+    "OR": {
+        "name": "OR Gate",
+        "symbol": "A OR B = Y",
+        "description": "The OR gate outputs TRUE (1) when AT LEAST ONE input is TRUE (1). It only outputs FALSE (0) when ALL inputs are FALSE (0).",
+        "truth_table": gate_truth_table("OR"),
+        "real_world": "Like a room with two light switches - either switch can turn on the light."
+    },
+    "NOT": {
+        "name": "NOT Gate (Inverter)",
+        "symbol": "NOT A = Y",
+        "description": "The NOT gate (inverter) has only ONE input. It outputs the OPPOSITE of the input. TRUE becomes FALSE, and FALSE becomes TRUE.",
+        "truth_table": gate_truth_table("NOT"),
+        "real_world": "Like a light switch - when it's ON, it turns OFF and vice versa."
+    },
+    "NAND": {
+        "name": "NAND Gate",
+        "symbol": "A NAND B = Y",
+        "description": "The NAND gate is an AND gate followed by a NOT gate. It outputs FALSE (0) only when ALL inputs are TRUE (1). Otherwise, it outputs TRUE (1).",
+        "truth_table": gate_truth_table("NAND"),
+        "real_world": "Like a safety system that triggers an alarm unless ALL conditions are normal."
+    },
+    "NOR": {
+        "name": "NOR Gate",
+        "symbol": "A NOR B = Y",
+        "description": "The NOR gate is an OR gate followed by a NOT gate. It outputs TRUE (1) only when ALL inputs are FALSE (0). Any TRUE input makes the output FALSE.",
+        "truth_table": gate_truth_table("NOR"),
+        "real_world": "Like a 'quiet mode' that activates only when ALL noise sources are off."
+    },
+    "XOR": {
+        "name": "XOR Gate (Exclusive OR)",
+        "symbol": "A XOR B = Y",
+        "description": "The XOR gate outputs TRUE (1) when the inputs are DIFFERENT. It outputs FALSE (0) when both inputs are the SAME.",
+        "truth_table": gate_truth_table("XOR"),
+        "real_world": "Like a hallway with switches at both ends - flipping either switch changes the light state."
+    },
+    "XNOR": {
+        "name": "XNOR Gate (Exclusive NOR)",
+        "symbol": "A XNOR B = Y",
+        "description": "The XNOR gate outputs TRUE (1) when both inputs are the SAME. It outputs FALSE (0) when the inputs are DIFFERENT.",
+        "truth_table": gate_truth_table("XNOR"),
+        "real_world": "Like a comparison checker - it says 'match' when both inputs are equal."
+    }
+}
+
+
+class SokobanRules:
+    def __init__(self, level_index, levels=None):
+        self.level_index = level_index
+        self.levels = LEVELS if levels is None else levels
+        self.load_level()
+    
+    def load_level(self):
+        level_data = self.levels[self.level_index]
+        self.board = Board(level_data["layout"])
+        self.initial_state = self.board.snapshot()
+        self.deadlocks = deadlock_tables(level_data["layout"])
+        self.gate = level_data["gate"]
+        self.height = self.board.height
+        self.width = self.board.width
+        self.level_loaded(level_data)
+        self.reset_progress()
+    
+    def level_loaded(self, level_data):
+        # hook for a view to set itself up before progress is reset
+        pass
+    
+    def cells_changed(self, cells):
+        # hook: board cells whose contents a move or undo just changed
+        pass
+    
+    def reset_progress(self):
+        self.moves = 0
+        # one byte per move (see board.move_code), so long sessions stay tiny
+        self.history = bytearray()
+        self.redo_log = bytearray()
+        self.deadlocked = False
+        self.deadlock_move = None
+        self.facing = 1
+    
+    def restart(self):
+        # copy the parsed start position back instead of re-parsing the level
+        self.board.restore(self.initial_state)
+        self.reset_progress()
+    
+    @property
+    def player_pos(self):
+        return list(self.board.xy(self.board.player))
+    
+    @property
+    def boxes(self):
+        return [list(self.board.xy(i)) for i in self.board.box_cells]
+    
+    @property
+    def targets(self):
+        return [list(self.board.xy(i)) for i in self.board.targets]
+    
+    def is_wall(self, x, y):
+        return self.board.is_wall(x, y)
+    
+    def is_box(self, x, y):
+        return self.board.is_box(x, y)
+    
+    def move_player(self, dx, dy):
+        if not self.apply_move(DIRECTIONS.index((dx, dy))):
+            return False
+        del self.redo_log[:]
+        return True
+    
+    def apply_move(self, direction):
+        board = self.board
+        start = board.player
+        result = board.move(direction)
+        if not result:
+            return False
+        self.cells_changed((start, board.player, board.player + board.deltas[direction]))
+        self.history.append(move_code(direction, result))
+        self.moves += 1
+        self.facing = direction
+        if result == 2 and not self.deadlocked:
+            box = board.player + board.deltas[direction]
+            if self.deadlocks.is_deadlock(box, board.box_at):
+                self.deadlocked = True
+                self.deadlock_move = len(self.history)
+        return True
+    
+    def undo(self):
+        if not self.history:
+            return False
+        code = self.history.pop()
+        board = self.board
+        d = board.deltas[code & 3]
+        self.cells_changed((board.player - d, board.player, board.player + d))
+        board.undo(code)
+        self.facing = code & 3
+        self.redo_log.append(code & ~PUSHED)
+        self.moves -= 1
+        if self.deadlocked and len(self.history) < self.deadlock_move:
+            self.deadlocked = False
+        return True
+    
+    def redo(self):
+        if not self.redo_log:
+            return False
+        return self.apply_move(self.redo_log.pop())
+    
+    def check_win(self):
+        return self.board.is_solved()
@@ -0,0 +1,105 @@
+"""Deadlock detection tables for Sokoban layouts.
+
+Dead squares are found once per layout by pulling a box backwards from every
+target: a floor cell no pull can reach is a corner, or a wall run with no
+target along it, and a box pushed there can never be solved. On top of that
+the dynamic check looks at the four 2x2 squares around a freshly pushed box;
+if one is filled entirely with walls and boxes and any of those boxes is off
+target, none of them can ever move again.
+
+Both checks assume every box has to reach a target. A level with more boxes
+than targets is won once the targets are covered, and a spare box can end up
+anywhere, so is_deadlock() never reports one there.
+
+Tables are cached per layout, so restarting a level or solving it again never
+recomputes them.
+"""
+
+from collections import deque
+from functools import lru_cache
+
+from board import Board, TARGET, WALL
+
+INFINITY = 1 << 30
+
+
+def pull_distances(static, deltas, targets):
+    # Minimum pushes from each cell to the nearest of targets, ignoring other
+    # boxes. Cells left at INFINITY can never reach any of them.
+    dist = [INFINITY] * len(static)
+    queue = deque()
+    for t in targets:
+        dist[t] = 0
+        queue.append(t)
+    while queue:
+        cell = queue.popleft()
+        for d in deltas:
+            prev = cell - d
+            # pulling from prev to cell needs the player at prev - d
+            if static[prev] & WALL or static[prev - d] & WALL:
+                continue
+            if dist[prev] == INFINITY:
+                dist[prev] = dist[cell] + 1
+                queue.append(prev)
+    return dist
+
+
+class DeadlockTables:
+    def __init__(self, layout, distances=None):
+        # distances can be passed in when they were computed before (see
+        # solvecache); everything else is cheap to rebuild
+        board = Board(layout)
+        self.stride = board.stride
+        self.deltas = board.deltas
+        self.static = bytes(c & (WALL | TARGET) for c in board.cells)
+        self.spare_boxes = len(board.box_cells) > len(board.targets)
+        if distances is None:
+            distances = pull_distances(self.static, self.deltas, board.targets)
+        self.distances = distances
+        self.dead = bytes(
+            1 if not flags & WALL and dist == INFINITY else 0
+            for flags, dist in zip(self.static, self.distances)
+        )
+        # Offsets of the top-left corner of each 2x2 square containing a cell.
+        s = self.stride
+        self.squares = tuple(
+            (corner, corner + 1, corner + s, corner + s + 1)
+            for corner in (0, -1, -s, -s - 1)
+        )
+
+    def is_dead_square(self, cell):
+        return self.dead[cell] != 0
+
+    def is_frozen(self, cell, boxes):
+        # boxes only needs to support "in": a set of cells or Board.box_at.
+        static = self.static
+        for square in self.squares:
+            off_target = False
+            for offset in square:
+                c = cell + offset
+                flags = static[c]
+                if flags & WALL:
+                    continue
+                if c not in boxes:
+                    break
+                if not flags & TARGET:
+                    off_target = True
+            else:
+                if off_target:
+                    return True
+        return False
+
+    def is_deadlock(self, cell, boxes):
+        """True if a box just pushed onto cell makes the level unsolvable."""
+        if self.spare_boxes:
+            return False
+        return self.dead[cell] != 0 or self.is_frozen(cell, boxes)
+
+
+@lru_cache(maxsize=64)
+def _tables(layout):
+    return DeadlockTables(layout)
+
+
+def deadlock_tables(layout):
+    return _tables(tuple(layout))
@@ -0,0 +1,279 @@
+"""Logic-gate evaluation over whole truth tables at once.
+
+A signal is a bit-packed int holding its value in every row of a truth
+table: bit r is the value for input combination r, where input 0 (A) is the
+most significant bit of r, matching the row order of the lesson tables.
+Every gate is then a handful of big-int bitwise operations, so all 2^N rows
+are evaluated together; 20 inputs (1M rows) take a few milliseconds.
+
+The gate functions only use &, | and ^, so they work unchanged on NumPy
+bool arrays too (pass mask=True).
+
+    >>> variables, column = truth_table("(A AND B) XOR NOT C")
+    >>> truth_table_rows(variables, column)[:3]
+    [('A', 'B', 'C', 'Y'), ('0', '0', '0', '1'), ('0', '0', '1', '0')]
+"""
+
+import re
+from collections.abc import Sequence
+from functools import lru_cache, reduce
+from operator import and_, or_, xor
+
+GATE_NAMES = ("AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR")
+
+
+def gate_and(mask, *inputs):
+    return reduce(and_, inputs)
+
+
+def gate_or(mask, *inputs):
+    return reduce(or_, inputs)
+
+
+def gate_not(mask, value):
+    return mask ^ value
+
+
+def gate_nand(mask, *inputs):
+    return mask ^ reduce(and_, inputs)
+
+
+def gate_nor(mask, *inputs):
+    return mask ^ reduce(or_, inputs)
+
+
+def gate_xor(mask, *inputs):
+    # N-input XOR is odd parity
+    return reduce(xor, inputs)
+
+
+def gate_xnor(mask, *inputs):
+    return mask ^ reduce(xor, inputs)
+
+
+GATES = {
+    "AND": gate_and,
+    "OR": gate_or,
+    "NOT": gate_not,
+    "NAND": gate_nand,
+    "NOR": gate_nor,
+    "XOR": gate_xor,
+    "XNOR": gate_xnor,
+}
+
+
+def row_mask(n):
+    """All-ones signal for an n-input table (2^n rows)."""
+    return (1 << (1 << n)) - 1
+
+
+@lru_cache(maxsize=8)
+def input_columns(n):
+    """The n input signals of a 2^n-row table, built by repeated doubling."""
+    rows = 1 << n
+    columns = []
+    for i in range(n):
+        period = 1 << (n - 1 - i)
+        # `period` zeros then `period` ones, then copied until it covers all rows
+        column = ((1 << period) - 1) << period
+        width = period * 2
+        while width < rows:
+            column |= column << width
+            width *= 2
+        columns.append(column)
+    return tuple(columns)
+
+
+def evaluate(gate, inputs, mask):
+    return GATES[gate](mask, *inputs)
+
+
+def gate_column(gate, n=None):
+    """Output signal of a single gate over its full n-input truth table."""
+    if n is None:
+        n = 1 if gate == "NOT" else 2
+    return evaluate(gate, input_columns(n), row_mask(n))
+
+
+# --- expressions -----------------------------------------------------------
+
+_TOKEN = re.compile(r"\s*(?:([A-Za-z_][A-Za-z0-9_]*)|([01])|(.))")
+# binary operators from loosest to tightest binding
+_LEVELS = (("OR", "NOR"), ("XOR", "XNOR"), ("AND", "NAND"))
+
+
+def _tokenize(text):
+    tokens = []
+    for name, const, other in _TOKEN.findall(text.strip()):
+        if name:
+            tokens.append(("name", name.upper() if name.upper() in GATES else name))
+        elif const:
+            tokens.append(("const", int(const)))
+        elif other in "(),":
+            tokens.append((other, other))
+        elif other:
+            raise ValueError(f"unexpected character {other!r} in expression")
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.variables = []
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, kind):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("unexpected end of expression")
+        if token[0] != kind:
+            raise ValueError(f"expected {kind!r}, found {token[1]!r}")
+        self.pos += 1
+        return token[1]
+
+    def parse(self):
+        node = self.binary(0)
+        if self.pos != len(self.tokens):
+            raise ValueError(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def binary(self, level):
+        if level == len(_LEVELS):
+            return self.unary()
+        node = self.binary(level + 1)
+        while self.peek()[0] == "name" and self.peek()[1] in _LEVELS[level]:
+            op = self.take("name")
+            node = (op, (node, self.binary(level + 1)))
+        return node
+
+    def unary(self):
+        kind, value = self.peek()
+        if kind == "name" and value == "NOT":
+            self.pos += 1
+            return ("NOT", (self.unary(),))
+        if kind == "const":
+            self.pos += 1
+            return ("const", value)
+        if kind == "(":
+            self.pos += 1
+            node = self.binary(0)
+            self.take(")")
+            return node
+        name = self.take("name")
+        if name in GATES:
+            # function form: AND(A, B, C)
+            self.take("(")
+            args = [self.binary(0)]
+            while self.peek()[0] == ",":
+                self.pos += 1
+                args.append(self.binary(0))
+            self.take(")")
+            return (name, tuple(args))
+        if name not in self.variables:
+            self.variables.append(name)
+        return ("var", name)
+
+
+def parse(text):
+    """Parse an expression; returns (variables in order of appearance, tree).
+
+    Operators are the gate names, infix (A NAND B) or as N-input functions
+    (XOR(A, B, C)). NOT binds tightest, then AND/NAND, XOR/XNOR, OR/NOR.
+    """
+    parser = _Parser(text)
+    tree = parser.parse()
+    return parser.variables, tree
+
+
+def evaluate_tree(tree, signals, mask):
+    kind, value = tree
+    if kind == "var":
+        return signals[value]
+    if kind == "const":
+        return mask if value else 0
+    return GATES[kind](mask, *(evaluate_tree(arg, signals, mask) for arg in value))
+
+
+def truth_table(expression, variables=None):
+    """Evaluate an expression over every input combination.
+
+    Returns (variables, column): column is the bit-packed output, bit r
+    being the output for row r. Pass variables to fix their order (and to
+    include ones the expression does not use).
+    """
+    found, tree = parse(expression)
+    if variables is None:
+        variables = found
+    else:
+        variables = list(variables)
+        missing = [name for name in found if name not in variables]
+        if missing:
+            raise ValueError(f"unknown variables: {', '.join(missing)}")
+    n = len(variables)
+    signals = dict(zip(variables, input_columns(n)))
+    return variables, evaluate_tree(tree, signals, row_mask(n))
+
+
+def output_at(column, row):
+    return (column >> row) & 1
+
+
+def output_bits(column, n):
+    """The column as a '0'/'1' string, character r being the output for row r.
+
+    One conversion for the whole table; calling output_at for every row
+    shifts the 2^n-bit column each time, which is quadratic.
+    """
+    return format(column, f"0{1 << n}b")[::-1]
+
+
+class TruthTableRows(Sequence):
+    """Rows of a truth table, built only when they are looked at.
+
+    A 20-input table has a million rows; making them all up front takes
+    seconds, while the lessons only ever show a page of them.
+    """
+
+    def __init__(self, variables, column, output="Y"):
+        self.header = tuple(variables) + (output,)
+        self.n = len(variables)
+        self.bits = output_bits(column, self.n)
+        self.row_format = f"0{self.n}b"
+
+    def __len__(self):
+        return len(self.bits) + 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("truth table row out of range")
+        if index == 0:
+            return self.header
+        r = index - 1
+        inputs = tuple(format(r, self.row_format)) if self.n else ()
+        return inputs + (self.bits[r],)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return f"TruthTableRows({list(self.header[:-1])!r}, {len(self) - 1} rows)"
+
+
+def truth_table_rows(variables, column, output="Y"):
+    """The table as rows of '0'/'1' strings with a header row, as the lessons show it."""
+    return TruthTableRows(variables, column, output)
+
+
+def gate_truth_table(gate, n=None):
+    if n is None:
+        n = 1 if gate == "NOT" else 2
+    return truth_table_rows("ABCDEFGHIJKLMNOPQRSTUVWXYZ"[:n], gate_column(gate, n))
@@ -0,0 +1,207 @@
+"""Background hints for the level being played.
+
+HintEngine runs the solver in a worker process and keeps it working on
+the latest position the game has reported with update(). A process rather
+than a thread keeps the search off the game's interpreter lock, so the
+frame loop never waits on it. update() only sends the box cells and the
+player, and hint() answers from what the worker has sent back so far.
+
+Work is reused across moves:
+
+* Positions are keyed by the boxes and the region the player can walk in,
+  so walking around without pushing does not start a new search.
+* Every position along a found solution is remembered together with its
+  next push, so following a hint (or getting back onto the solution) is
+  answered from that table without searching again.
+* One Solver lives as long as the level, so its lower-bound cache carries
+  over from one search to the next.
+* The solver's tables and the solution from the start position come from
+  the persistent solvecache when the level has been seen before, so the
+  first hint is ready straight away.
+
+A running search is cancelled as soon as the boxes move.
+
+    engine = HintEngine(layout)
+    engine.update(board)        # after every move
+    hint = engine.hint(board)   # None while still searching
+    engine.close()
+"""
+
+import multiprocessing
+import signal
+
+from board import DIRECTION_CHARS
+from solvecache import default_cache
+from solver import Solver
+
+# per search; levels too big to solve in this time just get no hint
+TIME_LIMIT = 20.0
+MAX_TABLE_SIZE = 500_000
+MAX_KNOWN = 100_000
+
+
+class Hint:
+    def __init__(self, status, boxes, region, box=None, direction=None, remaining=0):
+        # status is "push", "unsolvable" or "unknown" (gave up)
+        self.status = status
+        self.boxes = boxes
+        self.region = region
+        self.box = box
+        self.direction = direction
+        self.remaining = remaining
+
+    def applies_to(self, boxes, player):
+        return boxes == self.boxes and player in self.region
+
+
+class HintWorker:
+    """The solving side; lives in the worker process."""
+
+    def __init__(self, layout, time_limit=TIME_LIMIT, cache=None):
+        self.layout = layout
+        self.cache = cache
+        self.solver = Solver(layout, max_table_size=MAX_TABLE_SIZE, cache=cache)
+        self.time_limit = time_limit
+        # (boxes, lowest reachable cell) -> (box, direction, pushes left), or
+        # None for positions known to be unsolvable
+        self.known = {}
+        board = self.solver.board
+        self.start = (frozenset(board.box_cells), board.player)
+        stored = cache.solution(layout) if cache is not None else None
+        if stored is not None:
+            if stored.solved:
+                self.remember(*self.start, stored.solution)
+            else:
+                boxes, player = self.start
+                self.known[(boxes, min(self.solver._reachable(player, boxes)))] = None
+
+    def answer(self, boxes, player, cancel=None):
+        """The Hint for a position, or None if cancel was set first."""
+        solver = self.solver
+        region = solver._reachable(player, boxes)
+        key = (boxes, min(region))
+        if key not in self.known:
+            result = solver.solve(boxes, player, time_limit=self.time_limit, cancel=cancel)
+            if result.status == "cancelled":
+                return None
+            if result.status == "budget":
+                return Hint("unknown", boxes, region)
+            if self.cache is not None and (boxes, player) == self.start:
+                self.cache.store_solution(self.layout, result)
+            if len(self.known) > MAX_KNOWN:
+                self.known.clear()
+            if result.solved:
+                self.remember(boxes, player, result.solution)
+            self.known.setdefault(key, None)
+
+        step = self.known[key]
+        if step is None:
+            return Hint("unsolvable", boxes, region)
+        box, direction, remaining = step
+        return Hint("push", boxes, region, box, direction, remaining)
+
+    def remember(self, boxes, player, solution):
+        # record the next push for every position along the solution
+        solver = self.solver
+        deltas = solver.deltas
+        boxes = set(boxes)
+        pushes_left = sum(1 for move in solution if move.isupper())
+        for move in solution:
+            direction = DIRECTION_CHARS.index(move.lower())
+            d = deltas[direction]
+            if move.isupper():
+                frozen = frozenset(boxes)
+                key = (frozen, min(solver._reachable(player, frozen)))
+                self.known[key] = (player + d, direction, pushes_left)
+                pushes_left -= 1
+                boxes.remove(player + d)
+                boxes.add(player + 2 * d)
+            player += d
+
+
+def _wait(conn):
+    # a forked worker holds a copy of the game's end of the pipe, so a
+    # killed game does not show up as EOF; watch the parent instead
+    parent = multiprocessing.parent_process()
+    while not conn.poll(1.0):
+        if parent is not None and not parent.is_alive():
+            raise EOFError
+
+
+def _serve(layout, time_limit, conn, cancel):
+    # forked from the game, the worker inherits SDL's SIGTERM handler,
+    # which would stop terminate() from ending it
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    worker = HintWorker(layout, time_limit, default_cache())
+    position = None
+    while True:
+        # cleared before reading, so a cancel for a position sent after
+        # this point is never lost
+        cancel.clear()
+        try:
+            if position is None or conn.poll():
+                _wait(conn)
+                position = conn.recv()
+                # only the latest position matters
+                while conn.poll():
+                    position = conn.recv()
+        except EOFError:
+            return
+        boxes, player = position
+        if worker.solver.targets <= boxes:
+            position = None
+            continue
+        answer = worker.answer(boxes, player, cancel)
+        if answer is None:
+            # cancelled: go round again for whatever came in since
+            continue
+        conn.send(answer)
+        position = None
+
+
+class HintEngine:
+    def __init__(self, layout, time_limit=TIME_LIMIT):
+        self.conn, child = multiprocessing.Pipe()
+        self.cancel = multiprocessing.Event()
+        self.process = multiprocessing.Process(target=_serve, args=(layout, time_limit, child, self.cancel),
+                                               name="hint-solver", daemon=True)
+        self.process.start()
+        child.close()
+        self.sent = None
+        self.answer = None
+
+    def _receive(self):
+        try:
+            while self.conn.poll():
+                self.answer = self.conn.recv()
+        except (EOFError, OSError):
+            pass
+
+    def update(self, board):
+        """Report the position after a move; cheap enough to call on every one."""
+        self._receive()
+        boxes = frozenset(board.box_cells)
+        player = board.player
+        if self.answer is not None and self.answer.applies_to(boxes, player):
+            return
+        if self.sent == (boxes, player):
+            return
+        boxes_moved = self.sent is None or self.sent[0] != boxes
+        self.conn.send((boxes, player))
+        self.sent = (boxes, player)
+        if boxes_moved:
+            self.cancel.set()
+
+    def hint(self, board):
+        """The Hint for the board's position, or None while it is still being worked out."""
+        self._receive()
+        answer = self.answer
+        if answer is not None and answer.applies_to(frozenset(board.box_cells), board.player):
+            return answer
+        return None
+
+    def close(self):
+        # nothing the worker is doing is worth waiting for
+        self.conn.close()
+        self.process.kill()
+        self.process.join()
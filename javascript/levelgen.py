@@ -0,0 +1,334 @@
+"""Procedural Sokoban levels.
+
+Each level comes from one seed:
+
+1. A room is carved out of solid wall by a random walk that stamps small
+   blocks of floor, so the floor is always connected.
+2. Boxes start on randomly placed targets and are pulled away from them by
+   a random player (reverse play). Every pull can be undone by a push, so
+   the result is solvable by construction.
+3. The solver then verifies the level and measures it. The difficulty
+   score combines the optimal push count, the search's effective branching
+   factor and the share of floor that is a dead square.
+
+Levels are emitted in the LEVELS format (name, layout strings, gate) plus
+their seed and metrics. Seeds are spread over a process pool with a time
+budget per level. Accepted levels are cached on disk by seed, so asking for
+the same seeds again costs nothing.
+
+Usage:
+    python levelgen.py -n 200 -o generated.jsonl
+    python levelgen.py -n 50 --width 12 --height 10 --boxes 4 --min-score 40
+    python logicgames.py generated.jsonl
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from board import layout_hash
+from deadlock import deadlock_tables
+from levels import GATES
+from solver import Solver
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".level-cache")
+# bump when generation changes so stale caches are not reused
+GENERATOR_VERSION = 1
+# floor stamps for the room walk, as (dx, dy) offsets
+STAMPS = (
+    ((0, 0),),
+    ((0, 0), (1, 0)),
+    ((0, 0), (0, 1)),
+    ((0, 0), (1, 0), (0, 1), (1, 1)),
+)
+MAX_ATTEMPTS = 200
+# reverse plays tried per room; the one that scatters the boxes most is solved
+PLAYOUTS = 8
+SOLVER_NODES = 20_000
+
+
+class GeneratorSettings:
+    def __init__(self, width=10, height=9, boxes=3, pulls=None, min_score=0.0,
+                 time_limit=2.0, max_attempts=MAX_ATTEMPTS):
+        self.width = width
+        self.height = height
+        self.boxes = boxes
+        # enough pulls that boxes get properly mixed up
+        self.pulls = pulls if pulls is not None else boxes * 12
+        self.min_score = min_score
+        self.time_limit = time_limit
+        self.max_attempts = max_attempts
+
+    def cache_key(self):
+        # time_limit is left out: it only decides when to give up, an
+        # accepted level for a seed is the same whatever the budget
+        return (f"v{GENERATOR_VERSION}-{self.width}x{self.height}-b{self.boxes}"
+                f"-p{self.pulls}-s{self.min_score:g}-a{self.max_attempts}")
+
+
+def carve_room(rng, width, height):
+    """Set of floor cells (y * width + x) of a connected room inside a wall border."""
+    interior = (width - 2) * (height - 2)
+    wanted = int(interior * rng.uniform(0.45, 0.65))
+    floor = set()
+    x = rng.randrange(1, width - 1)
+    y = rng.randrange(1, height - 1)
+    while len(floor) < wanted:
+        for dx, dy in rng.choice(STAMPS):
+            cx, cy = x + dx, y + dy
+            if 0 < cx < width - 1 and 0 < cy < height - 1:
+                floor.add(cy * width + cx)
+        dx, dy = rng.choice(((0, -1), (0, 1), (-1, 0), (1, 0)))
+        x = min(max(x + dx, 1), width - 2)
+        y = min(max(y + dy, 1), height - 2)
+    return floor
+
+
+def _reachable(start, floor, boxes, deltas):
+    seen = {start}
+    stack = [start]
+    while stack:
+        cell = stack.pop()
+        for d in deltas:
+            nxt = cell + d
+            if nxt in floor and nxt not in boxes and nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return seen
+
+
+def reverse_play(rng, floor, targets, pulls, width):
+    """Pull boxes off the targets; returns (boxes, player) for the start position."""
+    deltas = (-width, width, -1, 1)
+    boxes = set(targets)
+    player = rng.choice(sorted(floor - boxes))
+    last_box = None
+    for _ in range(pulls):
+        reach = _reachable(player, floor, boxes, deltas)
+        # pulling b along d: the player stands at b + d and steps to b + 2d
+        moves = [(b, d) for b in boxes for d in deltas
+                 if b + d in reach and b + 2 * d in floor and b + 2 * d not in boxes]
+        if not moves:
+            break
+        # keep pulling the same box half of the time for longer box paths
+        same = [move for move in moves if move[0] == last_box]
+        box, d = rng.choice(same if same and rng.random() < 0.5 else moves)
+        boxes.remove(box)
+        boxes.add(box + d)
+        player = box + 2 * d
+        last_box = box + d
+    # the player may start anywhere it could have walked to
+    player = rng.choice(sorted(_reachable(player, floor, boxes, deltas)))
+    return boxes, player
+
+
+def scatter(boxes, targets, width):
+    # how far the boxes ended up from the targets, Manhattan to the nearest
+    return sum(min(abs(b % width - t % width) + abs(b // width - t // width) for t in targets)
+               for b in boxes)
+
+
+def render_layout(width, height, floor, targets, boxes, player):
+    # crop to the floor plus a one-cell wall border
+    xs = [cell % width for cell in floor]
+    ys = [cell // width for cell in floor]
+    rows = []
+    for y in range(min(ys) - 1, max(ys) + 2):
+        row = []
+        for x in range(min(xs) - 1, max(xs) + 2):
+            cell = y * width + x
+            if cell not in floor:
+                row.append("#")
+            elif cell == player:
+                row.append("+" if cell in targets else "@")
+            elif cell in boxes:
+                row.append("*" if cell in targets else "$")
+            else:
+                row.append("." if cell in targets else " ")
+        rows.append("".join(row))
+    return rows
+
+
+def score_level(layout, result):
+    """Difficulty metrics for a solved level; "score" is what gets compared."""
+    tables = deadlock_tables(layout)
+    floor = sum(1 for c in "".join(layout) if c != "#")
+    dead_density = sum(tables.dead) / floor if floor else 0.0
+    pushes = max(result.pushes, 1)
+    # effective branching factor: b with b ** pushes == nodes expanded
+    branching = max(result.nodes, 1) ** (1 / pushes)
+    score = result.pushes * (1 + math.log2(branching)) * (1 + dead_density)
+    return {
+        "moves": result.moves,
+        "pushes": result.pushes,
+        "nodes": result.nodes,
+        "branching": round(branching, 3),
+        "dead_density": round(dead_density, 3),
+        "score": round(score, 2),
+    }
+
+
+def generate_level(seed, settings, gate=None):
+    """The first acceptable level for seed, or None if the budget ran out."""
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + settings.time_limit
+    width, height = settings.width, settings.height
+    for attempt in range(settings.max_attempts):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        floor = carve_room(rng, width, height)
+        if len(floor) < settings.boxes * 3 + 1:
+            continue
+        targets = set(rng.sample(sorted(floor), settings.boxes))
+        boxes, player = max((reverse_play(rng, floor, targets, settings.pulls, width) for _ in range(PLAYOUTS)),
+                            key=lambda start: scatter(start[0], targets, width))
+        if len(boxes - targets) < max(1, settings.boxes - 1):
+            continue
+        layout = render_layout(width, height, floor, targets, boxes, player)
+        # a node cap rather than only the clock keeps the outcome the same on
+        # every machine, which is what makes caching by seed valid
+        result = Solver(layout).solve(time_limit=remaining, max_nodes=SOLVER_NODES)
+        if result.status == "budget" and time.perf_counter() >= deadline:
+            return None
+        if not result.solved or result.pushes < settings.boxes * 2:
+            continue
+        metrics = score_level(layout, result)
+        if metrics["score"] < settings.min_score:
+            continue
+        return {
+            "name": f"Generated {seed}",
+            "layout": layout,
+            "gate": gate if gate is not None else GATES[seed % len(GATES)],
+            "seed": seed,
+            "attempts": attempt + 1,
+            "metrics": metrics,
+            "solution": result.solution,
+        }
+    return None
+
+
+def _generate(seed, settings):
+    return seed, generate_level(seed, settings)
+
+
+def cache_path(settings):
+    return os.path.join(CACHE_DIR, f"levels-{settings.cache_key()}.jsonl")
+
+
+def load_cache(path):
+    levels = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    level = json.loads(line)
+                except ValueError:
+                    # a run killed mid-write leaves a partial last line
+                    continue
+                levels[level["seed"]] = level
+    except OSError:
+        pass
+    return levels
+
+
+def run(seeds, settings, out, workers=None, use_cache=True):
+    """Generate a level for every seed, streaming accepted ones to out as JSON lines."""
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    path = cache_path(settings)
+    cached = load_cache(path) if use_cache else {}
+    counts = {"accepted": 0, "cached": 0, "rejected": 0, "duplicate": 0}
+    seen = set()
+
+    def emit(level):
+        key = layout_hash(level["layout"])
+        if key in seen:
+            counts["duplicate"] += 1
+            return
+        seen.add(key)
+        out.write(json.dumps(level) + "\n")
+
+    cache_file = None
+    if use_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        cache_file = open(path, "a", encoding="utf-8")
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            seeds = iter(seeds)
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < window:
+                    try:
+                        seed = next(seeds)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if seed in cached:
+                        counts["cached"] += 1
+                        emit(cached[seed])
+                        continue
+                    pending.add(pool.submit(_generate, seed, settings))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    seed, level = future.result()
+                    if level is None:
+                        counts["rejected"] += 1
+                        continue
+                    counts["accepted"] += 1
+                    if cache_file is not None:
+                        cache_file.write(json.dumps(level) + "\n")
+                    emit(level)
+                out.flush()
+                if cache_file is not None:
+                    cache_file.flush()
+    finally:
+        if cache_file is not None:
+            cache_file.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate solvable Sokoban levels.")
+    parser.add_argument("-n", "--count", type=int, default=100, help="number of seeds to try")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("-o", "--output", help="write the levels (JSONL) here instead of stdout")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--height", type=int, default=9)
+    parser.add_argument("--boxes", type=int, default=3)
+    parser.add_argument("--pulls", type=int, default=None, help="reverse-play pulls (default: 12 per box)")
+    parser.add_argument("--min-score", type=float, default=0.0, help="reject easier levels")
+    parser.add_argument("--time-limit", type=float, default=2.0, help="seconds per level")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the seed cache")
+    args = parser.parse_args(argv)
+
+    settings = GeneratorSettings(args.width, args.height, args.boxes, args.pulls,
+                                 args.min_score, args.time_limit)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        counts = run(range(args.seed, args.seed + args.count), settings, out, args.workers,
+                     use_cache=not args.no_cache)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{n} {status}" for status, n in counts.items())
+    made = counts["accepted"] + counts["cached"] - counts["duplicate"]
+    print(f"{made} levels in {elapsed:.1f}s ({made / elapsed * 60:.0f}/min): {summary}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
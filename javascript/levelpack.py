@@ -0,0 +1,135 @@
+"""Lazy loader for standard XSB/SOK Sokoban level collections.
+
+The file is memory-mapped and scanned once for level boundaries; the
+resulting offset index is cached next to it as "<file>.idx" and reused as
+long as the file size and modification time match. Levels are only parsed
+when they are asked for, so opening a pack of thousands of levels costs a
+few milliseconds and almost no memory.
+
+A LevelPack behaves like the LEVELS list: len(pack) and pack[i] return a
+dict with "name", "layout" and "gate" keys.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from collections import OrderedDict
+
+from levels import GATES
+
+BOARD_CHARS = frozenset(b" #@+$*.-_")
+INDEX_MAGIC = b"LGIDX1\0\0"
+INDEX_HEADER = struct.Struct("<8sQqQ")  # magic, file size, mtime_ns, level count
+
+
+def _is_board_line(line):
+    line = line.rstrip(b"\r\n")
+    return b"#" in line and all(c in BOARD_CHARS for c in line)
+
+
+def scan(data):
+    """Return offsets (board_start, board_end, next_board_start) for every level."""
+    offsets = array("Q")
+    size = len(data)
+    pos = 0
+    board_start = None
+    while pos < size:
+        end = data.find(b"\n", pos)
+        end = size if end == -1 else end + 1
+        if _is_board_line(data[pos:end]):
+            if board_start is None:
+                if offsets:
+                    offsets[-1] = pos
+                board_start = pos
+        elif board_start is not None:
+            offsets.extend((board_start, pos, size))
+            board_start = None
+        pos = end
+    if board_start is not None:
+        offsets.extend((board_start, size, size))
+    return offsets
+
+
+class LevelPack:
+    def __init__(self, path, cache_size=32):
+        self.path = path
+        self.title = os.path.splitext(os.path.basename(path))[0]
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        if stat.st_size:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b""
+        self._offsets = self._load_index(stat)
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
+    def _index_path(self):
+        return self.path + ".idx"
+
+    def _load_index(self, stat):
+        try:
+            with open(self._index_path(), "rb") as f:
+                magic, size, mtime, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic == INDEX_MAGIC and size == stat.st_size and mtime == stat.st_mtime_ns:
+                    offsets = array("Q")
+                    offsets.fromfile(f, count * 3)
+                    return offsets
+        except (OSError, EOFError, struct.error):
+            pass
+
+        offsets = scan(self._data)
+        tmp_path = self._index_path() + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets) // 3))
+                offsets.tofile(f)
+            os.replace(tmp_path, self._index_path())
+        except OSError:
+            # read-only location: keep the index in memory only
+            pass
+        return offsets
+
+    def __len__(self):
+        return len(self._offsets) // 3
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("level index out of range")
+        level = self._cache.get(index)
+        if level is None:
+            level = self._parse(index)
+            self._cache[index] = level
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(index)
+        return level
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _parse(self, index):
+        start, end, meta_end = self._offsets[index * 3:index * 3 + 3]
+        text = self._data[start:end].decode("latin-1")
+        layout = [row.rstrip("\r").replace("-", " ").replace("_", " ") for row in text.split("\n")]
+        while layout and not layout[-1].strip():
+            layout.pop()
+
+        name = None
+        for line in self._data[end:meta_end].decode("latin-1").splitlines():
+            if line.lower().startswith("title:"):
+                name = line[6:].strip()
+                break
+        if not name:
+            name = f"{self.title} #{index + 1}"
+        return {"name": name, "layout": layout, "gate": GATES[index % len(GATES)]}
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
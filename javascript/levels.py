@@ -0,0 +1,101 @@
+"""Built-in Sokoban levels, one per logic gate lesson."""
+
+GATES = ["AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR"]
+
+LEVELS = [
+    {
+        "name": "Level 1 - Getting Started",
+        "layout": [
+            "########",
+            "#      #",
+            "#  @   #",
+            "#  $   #",
+            "#  .   #",
+            "#      #",
+            "########",
+        ],
+        "gate": "AND"
+    },
+    {
+        "name": "Level 2 - Two Boxes",
+        "layout": [
+            "##############",
+            "#     ##     #",
+            "# $   ##   $ #",
+            "#  $  ##  $  #",
+            "#     @      #",
+            "##### ## #####",
+            "#.  .    .  .#",
+            "##############",
+        ],
+        "gate": "OR"
+    },
+    {
+        "name": "Level 3 - Corner Push",
+        "layout": [
+            "##########",
+            "#        #",
+            "# $  # $ #",
+            "#  @ #   #",
+            "#### # # #",
+            "#.   .   #",
+            "##########",
+        ],
+        "gate": "NOT"
+    },
+    {
+        "name": "Level 4 - Two Rooms",
+        "layout": [
+            "###########",
+            "#    #    #",
+            "# $  # $  #",
+            "#  # # #  #",
+            "#  # @ #  #",
+            "#  #####  #",
+            "# .     . #",
+            "###########",
+        ],
+        "gate": "NAND"
+    },
+    {
+        "name": "Level 5 - The Maze",
+        "layout": [
+            "########",
+            "## @####",
+            "## $  ##",
+            "### # ##",
+            "#.# #  #",
+            "#.$  # #",
+            "#.   $ #",
+            "########",
+        ],
+        "gate": "NOR"
+    },
+    {
+        "name": "Level 6 - The Threat",
+        "layout": [
+            "########",
+            "###    #",
+            "###$$$ #",
+            "#  $.. #",
+            "#@$...##",
+            "####  ##",
+            "########",
+        ],
+        "gate": "XOR"
+    },
+    {
+        "name": "Level 7 - Final Challenge",
+        "layout": [
+            "########",
+            "#####  #",
+            "###. $ #",
+            "#..$ $ #",
+            "#.  $#@#",
+            "###    #",
+            "#####  #",
+            "########",
+        ],
+        "gate": "XNOR"
+    }
+]
@@ -0,0 +1,231 @@
+"""Simulated classroom for server.py.
+
+Every simulated student opens its own connection and plays the way a
+person would: it walks the solver's solution for its level (from
+solvecache) at a few moves a second, wanders off now and then and undoes
+it, sometimes restarts, and answers the quiz at random. A student waits
+for each reply before its next key press, and the time until the reply
+arrives is recorded.
+
+Usage:
+    python loadtest.py -n 300 --start-server     # run server.py on a free port
+    python loadtest.py -n 300 --port 8765 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+from board import DIRECTION_CHARS
+from server import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE, encode
+from solvecache import default_cache, solve
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DETOUR_CHANCE = 0.1
+RESTART_CHANCE = 0.005
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.quizzes = 0
+        self.correct = 0
+        self.disconnects = 0
+
+
+_solutions = {}
+
+
+def solution_for(layout):
+    # every student on the same level shares one solve, and the cache
+    # makes later runs free
+    key = tuple(layout)
+    if key not in _solutions:
+        result = solve(layout, default_cache(), time_limit=10.0)
+        _solutions[key] = result.solution if result.solved else ""
+    return _solutions[key]
+
+
+class Student:
+    def __init__(self, host, port, stats, rng, rate):
+        self.host = host
+        self.port = port
+        self.stats = stats
+        self.rng = rng
+        self.rate = rate
+        self.reader = None
+        self.writer = None
+        self.quiz = None
+        self.level = None
+
+    async def receive(self, until):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "quiz":
+                self.quiz = message
+            elif kind == "level":
+                self.level = message
+            elif kind == "error":
+                self.stats.errors += 1
+            if kind in until:
+                return message
+
+    async def request(self, message, until):
+        start = time.perf_counter()
+        self.writer.write(encode(message))
+        await self.writer.drain()
+        reply = await self.receive(until)
+        self.stats.latencies.append(time.perf_counter() - start)
+        return reply
+
+    async def think(self):
+        await asyncio.sleep(self.rng.expovariate(self.rate))
+
+    async def answer_quiz(self):
+        await self.think()
+        choice = self.rng.choice(self.quiz["options"])
+        self.quiz = None
+        result = await self.request({"type": "answer", "choice": choice}, {"result"})
+        self.stats.quizzes += 1
+        self.stats.correct += result["correct"]
+        # either the next (or same) level, or the end of the pack
+        message = await self.receive({"level", "finished"})
+        if message["type"] == "finished":
+            await self.request({"type": "start", "level": 0}, {"level"})
+
+    async def play(self, deadline):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE)
+        try:
+            welcome = await self.request({"type": "hello", "name": f"sim-{id(self) & 0xFFFF:04x}"}, {"welcome"})
+            await self.request({"type": "start", "level": self.rng.randrange(welcome["levels"])}, {"level"})
+            level = None
+            while time.perf_counter() < deadline:
+                if self.quiz is not None:
+                    await self.answer_quiz()
+                    continue
+                if self.level is not level:
+                    level = self.level
+                    solution = solution_for(level["layout"])
+                    step = 0
+                    detour = False
+                await self.think()
+                if detour:
+                    await self.request({"type": "undo"}, {"delta"})
+                    detour = False
+                elif self.rng.random() < RESTART_CHANCE or step >= len(solution):
+                    await self.request({"type": "restart"}, {"delta"})
+                    step = 0
+                elif self.rng.random() < DETOUR_CHANCE:
+                    reply = await self.request({"type": "move", "dir": self.rng.randrange(4)}, {"delta"})
+                    detour = reply["op"] == "move"
+                else:
+                    direction = DIRECTION_CHARS.index(solution[step].lower())
+                    reply = await self.request({"type": "move", "dir": direction}, {"delta"})
+                    if reply["op"] != "move":
+                        self.stats.errors += 1
+                    step += 1
+                    if step == len(solution):
+                        await self.receive({"quiz"})
+        finally:
+            self.writer.close()
+
+
+async def run(host, port, count, duration, rate, ramp, seed):
+    stats = Stats()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = start + ramp + duration
+
+    async def one(i):
+        # spread the connects out instead of flooding the accept queue
+        await asyncio.sleep(ramp * i / count)
+        student = Student(host, port, stats, random.Random(rng.random()), rate)
+        try:
+            await student.play(deadline)
+        except (ConnectionError, OSError):
+            stats.disconnects += 1
+
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return stats, time.perf_counter() - start
+
+
+def start_server(pack=None):
+    command = [sys.executable, os.path.join(SCRIPT_DIR, "server.py"), "--port", "0"]
+    if pack:
+        command.append(pack)
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    match = re.search(r"on (\S+):(\d+)", line)
+    if match is None:
+        process.kill()
+        raise RuntimeError(f"server did not start: {line.strip()}")
+    return process, match.group(1), int(match.group(2))
+
+
+def _children_cpu():
+    # Best effort: getrusage only exists on Unix-like systems.
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate a classroom of students against server.py.")
+    parser.add_argument("-n", "--students", type=int, default=100)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of play after everyone joined")
+    parser.add_argument("--rate", type=float, default=3.0, help="key presses per second per student")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which students join")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-server", action="store_true", help="run server.py on a free port for the test")
+    parser.add_argument("--pack", help="level pack for --start-server")
+    args = parser.parse_args(argv)
+
+    process = None
+    host, port = args.host, args.port
+    if args.start_server:
+        process, host, port = start_server(args.pack)
+    try:
+        stats, elapsed = asyncio.run(run(host, port, args.students, args.duration, args.rate, args.ramp, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies = sorted(stats.latencies)
+    print(f"{args.students} students, {len(latencies)} requests in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:.0f}/s)")
+    if latencies:
+        print("round trip ms: " + "  ".join(
+            f"p{int(f * 100)} {percentile(latencies, f) * 1000:.2f}" for f in (0.5, 0.9, 0.99))
+            + f"  max {latencies[-1] * 1000:.2f}")
+    print(f"{stats.quizzes} quizzes answered ({stats.correct} right), "
+          f"{stats.errors} errors, {stats.disconnects} disconnects")
+    if process is not None:
+        cpu = _children_cpu()
+        if cpu is not None:
+            print(f"server CPU {cpu:.2f}s ({100 * cpu / elapsed:.1f}% of one core)")
+    return 1 if stats.errors or stats.disconnects else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
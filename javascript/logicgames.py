@@ -1,14 +1,35 @@
 import pygame
 import sys
-import random
 import os
+import time
+from collections import OrderedDict
 
-pygame.init()
+from assets import assets
+from audio import AudioManager
+from board import BOX, DIRECTIONS, TARGET, layout_problem
+from core import LOGIC_GATES, SokobanRules
+from hints import HintEngine
+from levels import GATES, LEVELS
+from levelpack import LevelPack
+from profiler import DRAW, EVENTS, FLIP, TICK, TRANSITIONS, WAIT, FrameProfiler
+from quizgen import pick_question
+from replay import Replay
+from sprites import PLAYER_SPRITES, SpriteAtlas, art_files, load_art
+from textcache import render_text, wrap_text
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 TILE_SIZE = 50
 
+# Boards larger than the screen scroll inside this area, following the player.
+VIEWPORT = pygame.Rect(0, 45, SCREEN_WIDTH, SCREEN_HEIGHT - 120)
+# Fraction of the remaining distance the camera covers each frame.
+CAMERA_EASING = 0.25
+# Large boards are pre-rendered in square chunks of this many tiles...
+CHUNK_TILES = 8
+# ...and only this many recently visible chunks are kept.
+MAX_CHUNKS = 32
+
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GRAY = (128, 128, 128)
@@ -24,265 +45,56 @@ CYAN = (100, 255, 255)
 BROWN = (139, 90, 43)
 DARK_BROWN = (101, 67, 33)
 
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Logic Gates Adventure")
-clock = pygame.time.Clock()
+# Longest time the idle loop sleeps in pygame.event.wait before looking around.
+IDLE_TIMEOUT_MS = 250
+
+# The window, clock and fonts are created by init_display, which Game.run
+# calls; importing this module does not touch SDL.
+screen = None
+clock = None
+font_large = None
+font_medium = None
+font_small = None
+font_tiny = None
+
 
-font_large = pygame.font.Font(None, 64)
-font_medium = pygame.font.Font(None, 42)
-font_small = pygame.font.Font(None, 32)
-font_tiny = pygame.font.Font(None, 24)
+def init_display():
+    global screen, clock, font_large, font_medium, font_small, font_tiny
+    if screen is not None:
+        return screen
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Logic Gates Adventure")
+    clock = pygame.time.Clock()
+    font_large = pygame.font.Font(None, 64)
+    font_medium = pygame.font.Font(None, 42)
+    font_small = pygame.font.Font(None, 32)
+    font_tiny = pygame.font.Font(None, 24)
+    return screen
 
-# Optional wall image (look in several common asset locations). If found, it's
-# scaled to the tile interior size and used when rendering '#' tiles.
-WALL_IMAGE = None
-# Look for common wall image names in the script directory and a few subfolders.
 script_dir = os.path.dirname(os.path.abspath(__file__))
-candidates = [
-    "walls.jpg",
-    os.path.join("assets", "wall.png"), os.path.join("assets", "walls.png"),
-]
-for name in candidates:
-    path = os.path.join(script_dir, name) if not os.path.isabs(name) else name
-    try:
-        if os.path.isfile(path):
-            img = pygame.image.load(path).convert_alpha()
-            WALL_IMAGE = pygame.transform.smoothscale(img, (TILE_SIZE, TILE_SIZE))
-            print(f"Loaded wall image: {path}")
-            break
-    except Exception as e:
-        print(f"Failed loading wall image '{path}': {e}")
 
-if WALL_IMAGE is None:
-    print("No wall image found — using colored rectangles for walls.")
+# Sound files, relative to the script (see assets.AssetManager).
+MENU_MUSIC = os.path.join('sounds', 'zil-sesi-433221.mp3')
+RIGHT_ANSWER_SOUND = os.path.join('sounds', 'right-answer.mp3')
+WRONG_ANSWER_SOUND = os.path.join('sounds', 'wrong-buzzer.mp3')
+
+# Character, wall, box and target art, packed on first use (it needs the
+# display to exist), see sprite_atlas.
+_sprite_atlas = None
+
 
-LEVELS = [
-    {
-        "name": "Level 1 - Getting Started",
-        "layout": [
-            "########",
-            "#      #",
-            "#  @   #",
-            "#  $   #",
-            "#  .   #",
-            "#      #",
-            "########",
-        ],
-        "gate": "AND"
-    },
-    {
-        "name": "Level 2 - Two Boxes",
-        "layout": [
-            "##############",
-            "#     ##     #",
-            "# $   ##   $ #",
-            "#  $  ##  $  #",
-            "#     @      #",
-            "##### ## #####",
-            "#.  .    .  .#",
-            "##############",
-        ],
-        "gate": "OR"
-    },
-    {
-        "name": "Level 3 - Corner Push",
-        "layout": [
-            "##########",
-            "#        #",
-            "# $  # $ #",
-            "#  @ #   #",
-            "#### # # #",
-            "#.   .   #",
-            "##########",
-        ],
-        "gate": "NOT"
-    },
-    {
-        "name": "Level 4 - Two Rooms",
-        "layout": [
-            "###########",
-            "#    #    #",
-            "# $  # $  #",
-            "#  # # #  #",
-            "#  # @ #  #",
-            "#  #####  #",
-            "# .     . #",
-            "###########",
-        ],
-        "gate": "NAND"
-    },
-    {
-        "name": "Level 5 - The Maze",
-        "layout": [
-            "########",
-            "## @####",
-            "## $  ##",
-            "### # ##",
-            "#.# #  #",
-            "#.$  # #",
-            "#.   $ #",
-            "########",
-        ],
-        "gate": "NOR"
-    },
-    {
-        "name": "Level 6 - The Threat",
-        "layout": [
-            "########",
-            "###    #",
-            "###$$$ #",
-            "#  $.. #",
-            "#@$...##",
-            "####  ##",
-            "########",
-        ],
-        "gate": "XOR"
-    },
-    {
-        "name": "Level 7 - Final Challenge",
-        "layout": [
-            "########",
-            "#####  #",
-            "###. $ #",
-            "#..$ $ #",
-            "#.  $#@#",
-            "###    #",
-            "#####  #",
-            "########",
-        ],
-        "gate": "XNOR"
-    }
-]
+def sprite_atlas():
+    global _sprite_atlas
+    if _sprite_atlas is None:
+        _sprite_atlas = SpriteAtlas(load_art(assets.image), TILE_SIZE)
+    return _sprite_atlas
 
-LOGIC_GATES = {
-    "AND": {
-        "name": "AND Gate",
-        "symbol": "A AND B = Y",
-        "description": "The AND gate outputs TRUE (1) only when ALL inputs are TRUE (1). If any input is FALSE (0), the output is FALSE (0).",
-        "truth_table": [
-            ("A", "B", "Y"),
-            ("0", "0", "0"),
-            ("0", "1", "0"),
-            ("1", "0", "0"),
-            ("1", "1", "1"),
-        ],
-        "real_world": "Like a security door that needs BOTH a key card AND a PIN code to open."
-    },
-    "OR": {
-        "name": "OR Gate",
-        "symbol": "A OR B = Y",
-        "description": "The OR gate outputs TRUE (1) when AT LEAST ONE input is TRUE (1). It only outputs FALSE (0) when ALL inputs are FALSE (0).",
-        "truth_table": [
-            ("A", "B", "Y"),
-            ("0", "0", "0"),
-            ("0", "1", "1"),
-            ("1", "0", "1"),
-            ("1", "1", "1"),
-        ],
-        "real_world": "Like a room with two light switches - either switch can turn on the light."
-    },
-    "NOT": {
-        "name": "NOT Gate (Inverter)",
-        "symbol": "NOT A = Y",
-        "description": "The NOT gate (inverter) has only ONE input. It outputs the OPPOSITE of the input. TRUE becomes FALSE, and FALSE becomes TRUE.",
-        "truth_table": [
-            ("A", "Y"),
-            ("0", "1"),
-            ("1", "0"),
-        ],
-        "real_world": "Like a light switch - when it's ON, it turns OFF and vice versa."
-    },
-    "NAND": {
-        "name": "NAND Gate",
-        "symbol": "A NAND B = Y",
-        "description": "The NAND gate is an AND gate followed by a NOT gate. It outputs FALSE (0) only when ALL inputs are TRUE (1). Otherwise, it outputs TRUE (1).",
-        "truth_table": [
-            ("A", "B", "Y"),
-            ("0", "0", "1"),
-            ("0", "1", "1"),
-            ("1", "0", "1"),
-            ("1", "1", "0"),
-        ],
-        "real_world": "Like a safety system that triggers an alarm unless ALL conditions are normal."
-    },
-    "NOR": {
-        "name": "NOR Gate",
-        "symbol": "A NOR B = Y",
-        "description": "The NOR gate is an OR gate followed by a NOT gate. It outputs TRUE (1) only when ALL inputs are FALSE (0). Any TRUE input makes the output FALSE.",
-        "truth_table": [
-            ("A", "B", "Y"),
-            ("0", "0", "1"),
-            ("0", "1", "0"),
-            ("1", "0", "0"),
-            ("1", "1", "0"),
-        ],
-        "real_world": "Like a 'quiet mode' that activates only when ALL noise sources are off."
-    },
-    "XOR": {
-        "name": "XOR Gate (Exclusive OR)",
-        "symbol": "A XOR B = Y",
-        "description": "The XOR gate outputs TRUE (1) when the inputs are DIFFERENT. It outputs FALSE (0) when both inputs are the SAME.",
-        "truth_table": [
-            ("A", "B", "Y"),
-            ("0", "0", "0"),
-            ("0", "1", "1"),
-            ("1", "0", "1"),
-            ("1", "1", "0"),
-        ],
-        "real_world": "Like a hallway with switches at both ends - flipping either switch changes the light state."
-    },
-    "XNOR": {
-        "name": "XNOR Gate (Exclusive NOR)",
-        "symbol": "A XNOR B = Y",
-        "description": "The XNOR gate outputs TRUE (1) when both inputs are the SAME. It outputs FALSE (0) when the inputs are DIFFERENT.",
-        "truth_table": [
-            ("A", "B", "Y"),
-            ("0", "0", "1"),
-            ("0", "1", "0"),
-            ("1", "0", "0"),
-            ("1", "1", "1"),
-        ],
-        "real_world": "Like a comparison checker - it says 'match' when both inputs are equal."
-    }
-}
+# Pre-rendered static layer of recently played levels, see SokobanGame.background.
+_background_cache = {}
 
-QUIZ_QUESTIONS = {
-    "AND": [
-        {"question": "What is the output of AND gate when A=1 and B=1?", "options": ["0", "1"], "answer": "1"},
-        {"question": "AND gate outputs 1 only when:", "options": ["All inputs are 1", "Any input is 1", "All inputs are 0"], "answer": "All inputs are 1"},
-        {"question": "What is 0 AND 1?", "options": ["0", "1"], "answer": "0"},
-    ],
-    "OR": [
-        {"question": "What is the output of OR gate when A=0 and B=1?", "options": ["0", "1"], "answer": "1"},
-        {"question": "OR gate outputs 0 only when:", "options": ["All inputs are 0", "Any input is 0", "All inputs are 1"], "answer": "All inputs are 0"},
-        {"question": "What is 1 OR 0?", "options": ["0", "1"], "answer": "1"},
-    ],
-    "NOT": [
-        {"question": "What is NOT 1?", "options": ["0", "1"], "answer": "0"},
-        {"question": "What is NOT 0?", "options": ["0", "1"], "answer": "1"},
-        {"question": "NOT gate is also called:", "options": ["Inverter", "Buffer", "Amplifier"], "answer": "Inverter"},
-    ],
-    "NAND": [
-        {"question": "What is 1 NAND 1?", "options": ["0", "1"], "answer": "0"},
-        {"question": "NAND is equivalent to:", "options": ["NOT(AND)", "NOT(OR)", "AND(NOT)"], "answer": "NOT(AND)"},
-        {"question": "What is 0 NAND 0?", "options": ["0", "1"], "answer": "1"},
-    ],
-    "NOR": [
-        {"question": "What is 0 NOR 0?", "options": ["0", "1"], "answer": "1"},
-        {"question": "NOR gate outputs 1 only when:", "options": ["All inputs are 0", "Any input is 0", "All inputs are 1"], "answer": "All inputs are 0"},
-        {"question": "What is 1 NOR 0?", "options": ["0", "1"], "answer": "0"},
-    ],
-    "XOR": [
-        {"question": "What is 1 XOR 1?", "options": ["0", "1"], "answer": "0"},
-        {"question": "XOR outputs 1 when:", "options": ["Inputs are different", "Inputs are same", "All inputs are 1"], "answer": "Inputs are different"},
-        {"question": "What is 0 XOR 1?", "options": ["0", "1"], "answer": "1"},
-    ],
-    "XNOR": [
-        {"question": "What is 1 XNOR 1?", "options": ["0", "1"], "answer": "1"},
-        {"question": "XNOR outputs 1 when:", "options": ["Inputs are same", "Inputs are different", "Any input is 1"], "answer": "Inputs are same"},
-        {"question": "What is 0 XNOR 1?", "options": ["0", "1"], "answer": "0"},
-    ]
-}
+# Every solved level is recorded here as a compact replay (see replay.py).
+REPLAY_DIR = os.path.join(script_dir, "replays")
 
 class Button:
     def __init__(self, x, y, width, height, text, color=BLUE, hover_color=CYAN, text_color=WHITE):
@@ -298,7 +110,7 @@ class Button:
         pygame.draw.rect(surface, color, self.rect, border_radius=10)
         pygame.draw.rect(surface, WHITE, self.rect, 3, border_radius=10)
         
-        text_surface = font_medium.render(self.text, True, self.text_color)
+        text_surface = render_text(font_medium, self.text, True, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
     
@@ -310,88 +122,151 @@ class Button:
                 return True
         return False
 
-class SokobanGame:
-    def __init__(self, level_index):
-        self.level_index = level_index
-        self.load_level()
-    
-    def load_level(self):
-        level_data = LEVELS[self.level_index]
-        self.layout = [list(row) for row in level_data["layout"]]
-        self.gate = level_data["gate"]
-        self.height = len(self.layout)
-        self.width = max(len(row) for row in self.layout)
-        
-        self.player_pos = None
-        self.boxes = []
-        self.targets = []
-        self.walls = []
-        
-        for y, row in enumerate(self.layout):
-            for x, cell in enumerate(row):
-                if cell == '@':
-                    self.player_pos = [x, y]
-                    self.layout[y][x] = ' '
-                elif cell == '$':
-                    self.boxes.append([x, y])
-                    self.layout[y][x] = ' '
-                elif cell == '.':
-                    self.targets.append([x, y])
-                elif cell == '#':
-                    self.walls.append([x, y])
+class SokobanGame(SokobanRules):
+    """SokobanRules plus everything needed to draw it."""
+    
+    def level_loaded(self, level_data):
+        self.layout = [['#' if cell == '#' else ' ' for cell in row] for row in level_data["layout"]]
         
+        # boards that fit in the viewport are centred and drawn from one
+        # cached layer; bigger ones scroll with a camera that follows the
+        # player and stay clear of the HUD above and below the viewport
+        self.scrolling = self.width * TILE_SIZE > VIEWPORT.width or self.height * TILE_SIZE > VIEWPORT.height
         self.offset_x = (SCREEN_WIDTH - self.width * TILE_SIZE) // 2
         self.offset_y = (SCREEN_HEIGHT - self.height * TILE_SIZE) // 2
-        self.moves = 0
+        self.chunks = OrderedDict()
     
-    def is_wall(self, x, y):
-        if x < 0 or y < 0 or y >= len(self.layout) or x >= len(self.layout[y]):
-            return True
-        return self.layout[y][x] == '#'
+    def reset_progress(self):
+        super().reset_progress()
+        # rendering state: cells to repaint next frame, or everything
+        self.full_redraw = True
+        self.dirty_cells = set()
+        self.hud_rects = []
+        self.hud_state = None
+        self.hint = None
+        self.hint_message = None
+        if self.scrolling:
+            self.snap_camera()
     
-    def is_box(self, x, y):
-        return [x, y] in self.boxes
+    def cells_changed(self, cells):
+        self.dirty_cells.update(cells)
     
-    def move_player(self, dx, dy):
-        new_x = self.player_pos[0] + dx
-        new_y = self.player_pos[1] + dy
-        
-        if self.is_wall(new_x, new_y):
+    def hint_cells(self):
+        if self.hint is None or self.hint.status != "push":
+            return ()
+        return (self.hint.box, self.hint.box + self.board.deltas[self.hint.direction])
+    
+    def show_hint(self, hint):
+        # hint is a hints.Hint, or None while the solver is still working
+        self.dirty_cells.update(self.hint_cells())
+        self.hint = hint
+        if hint is None:
+            self.hint_message = "Still thinking... press H again in a moment"
+        elif hint.status == "push":
+            self.hint_message = f"Push the marked box ({hint.remaining} pushes to go)"
+        elif hint.status == "unsolvable":
+            self.hint_message = "No way to solve it from here. Press Z to undo or R to restart"
+        else:
+            self.hint_message = "No hint for this level, it is too big to work out"
+        self.dirty_cells.update(self.hint_cells())
+    
+    def hide_hint(self):
+        self.dirty_cells.update(self.hint_cells())
+        self.hint = None
+        self.hint_message = None
+    
+    def hint_applies(self):
+        return self.hint is not None and self.hint.applies_to(frozenset(self.board.box_cells), self.board.player)
+    
+    def cell_rect(self, cell):
+        x, y = self.board.xy(cell)
+        return pygame.Rect(self.offset_x + x * TILE_SIZE, self.offset_y + y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+    
+    def camera_target(self):
+        # keep the player centred in the viewport, clamped to the board edges;
+        # an axis that fits in the viewport stays centred
+        px, py = self.board.xy(self.board.player)
+        target = []
+        for player, board_size, view_size in ((px, self.width, VIEWPORT.width), (py, self.height, VIEWPORT.height)):
+            board_px = board_size * TILE_SIZE
+            if board_px <= view_size:
+                target.append((board_px - view_size) / 2)
+            else:
+                centre = player * TILE_SIZE + TILE_SIZE / 2 - view_size / 2
+                target.append(min(max(centre, 0), board_px - view_size))
+        return target
+    
+    def snap_camera(self):
+        self.camera = self.camera_target()
+        self.update_offsets()
+    
+    def update_offsets(self):
+        self.offset_x = VIEWPORT.x - round(self.camera[0])
+        self.offset_y = VIEWPORT.y - round(self.camera[1])
+    
+    def update_camera(self):
+        """Ease the camera towards the player; returns True if the view moved."""
+        target = self.camera_target()
+        if target == self.camera:
             return False
-        
-        if self.is_box(new_x, new_y):
-            box_new_x = new_x + dx
-            box_new_y = new_y + dy
-            
-            if self.is_wall(box_new_x, box_new_y) or self.is_box(box_new_x, box_new_y):
-                return False
-            
-            box_index = self.boxes.index([new_x, new_y])
-            self.boxes[box_index] = [box_new_x, box_new_y]
-        
-        self.player_pos = [new_x, new_y]
-        self.moves += 1
-        return True
+        old_offsets = (self.offset_x, self.offset_y)
+        for axis in (0, 1):
+            distance = target[axis] - self.camera[axis]
+            if abs(distance) < 1:
+                self.camera[axis] = target[axis]
+            else:
+                self.camera[axis] += distance * CAMERA_EASING
+        self.update_offsets()
+        return (self.offset_x, self.offset_y) != old_offsets
     
-    def check_win(self):
-        for target in self.targets:
-            if target not in self.boxes:
-                return False
-        return True
+    def is_animating(self):
+        return self.scrolling and self.camera_target() != self.camera
     
-    def draw(self, surface):
+    def visible_tiles(self):
+        # tile range (x0, y0, x1, y1), end exclusive, that intersects the viewport
+        x0 = max(0, (VIEWPORT.x - self.offset_x) // TILE_SIZE)
+        y0 = max(0, (VIEWPORT.y - self.offset_y) // TILE_SIZE)
+        x1 = min(self.width, (VIEWPORT.right - self.offset_x + TILE_SIZE - 1) // TILE_SIZE)
+        y1 = min(self.height, (VIEWPORT.bottom - self.offset_y + TILE_SIZE - 1) // TILE_SIZE)
+        return x0, y0, x1, y1
+    
+    def background(self, surface):
+        # floor, walls, targets, title and help text never change while a
+        # level is played, so they are rendered once per level and reused;
+        # boards bigger than the screen only keep the title and help text here
+        # and render their tiles in chunks (see board_chunk)
+        level_data = self.levels[self.level_index]
+        key = (level_data["name"], tuple(level_data["layout"]))
+        background = _background_cache.get(key)
+        if background is None:
+            if len(_background_cache) >= 16:
+                _background_cache.clear()
+            background = pygame.Surface(surface.get_size(), 0, surface)
+            self.draw_static(background)
+            _background_cache[key] = background
+        return background
+    
+    def draw_static(self, surface):
         surface.fill(DARK_GRAY)
         
-        title = font_medium.render(LEVELS[self.level_index]["name"], True, WHITE)
+        title = render_text(font_medium, self.levels[self.level_index]["name"], True, WHITE)
         surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 10))
         
-        moves_text = font_small.render(f"Moves: {self.moves}", True, WHITE)
-        surface.blit(moves_text, (10, 10))
+        if not self.scrolling:
+            self.draw_tiles(surface, 0, 0, self.width, self.height, self.offset_x, self.offset_y)
         
-        for y, row in enumerate(self.layout):
-            for x, cell in enumerate(row):
-                screen_x = self.offset_x + x * TILE_SIZE
-                screen_y = self.offset_y + y * TILE_SIZE
+        help_text = render_text(font_tiny, "Arrows move | Z undo | Y redo | R restart | H hint | ESC menu", True, WHITE)
+        surface.blit(help_text, (SCREEN_WIDTH // 2 - help_text.get_width() // 2, SCREEN_HEIGHT - 30))
+    
+    def draw_tiles(self, surface, x0, y0, x1, y1, origin_x, origin_y):
+        board = self.board
+        atlas = sprite_atlas()
+        for y in range(y0, y1):
+            row = self.layout[y]
+            for x in range(x0, min(x1, len(row))):
+                cell = row[x]
+                screen_x = origin_x + x * TILE_SIZE
+                screen_y = origin_y + y * TILE_SIZE
                 
                 pygame.draw.rect(surface, LIGHT_GRAY, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
 
@@ -400,47 +275,179 @@ class SokobanGame:
                     pygame.draw.rect(surface, GRAY, (screen_x, screen_y, TILE_SIZE, TILE_SIZE), 1)
                 
                 if cell == '#':
-                    # available, otherwise fill the entire tile with color.
-                    if WALL_IMAGE:
-                        surface.blit(WALL_IMAGE, (screen_x, screen_y))
+                    # use the wall texture if one was found, otherwise fill the entire tile with color.
+                    wall = atlas.get("wall", TILE_SIZE)
+                    if wall:
+                        surface.blit(wall, (screen_x, screen_y))
                     else:
                         pygame.draw.rect(surface, BROWN, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
+                elif board.cells[board.index(x, y)] & TARGET:
+                    surface.blit(atlas.get("target", TILE_SIZE), (screen_x, screen_y))
+    
+    def board_chunk(self, chunk_x, chunk_y, surface):
+        # static tiles of a CHUNK_TILES x CHUNK_TILES block, rendered on first
+        # use; only recently visible chunks are kept
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+        size = CHUNK_TILES * TILE_SIZE
+        chunk = pygame.Surface((size, size), 0, surface)
+        chunk.fill(DARK_GRAY)
+        x0 = chunk_x * CHUNK_TILES
+        y0 = chunk_y * CHUNK_TILES
+        self.draw_tiles(chunk, x0, y0, min(self.width, x0 + CHUNK_TILES), min(self.height, y0 + CHUNK_TILES),
+                        -x0 * TILE_SIZE, -y0 * TILE_SIZE)
+        self.chunks[key] = chunk
+        if len(self.chunks) > MAX_CHUNKS:
+            self.chunks.popitem(last=False)
+        return chunk
+    
+    def restore_cell(self, surface, background, cell):
+        # repaint the static layer under one cell and return its rect
+        rect = self.cell_rect(cell)
+        if not self.scrolling:
+            surface.blit(background, rect, rect)
+            return rect
+        x, y = self.board.xy(cell)
+        rect = rect.clip(VIEWPORT)
+        if not rect or not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        chunk = self.board_chunk(x // CHUNK_TILES, y // CHUNK_TILES, surface)
+        chunk_left = self.offset_x + (x // CHUNK_TILES) * CHUNK_TILES * TILE_SIZE
+        chunk_top = self.offset_y + (y // CHUNK_TILES) * CHUNK_TILES * TILE_SIZE
+        surface.blit(chunk, rect, rect.move(-chunk_left, -chunk_top))
+        return rect
+    
+    def draw_box(self, surface, box):
+        on_target = self.board.cells[box] & TARGET != 0
+        sprite = sprite_atlas().get("box_on_target" if on_target else "box", TILE_SIZE)
+        surface.blit(sprite, self.cell_rect(box))
+    
+    def draw_player(self, surface):
+        rect = self.cell_rect(self.board.player)
+        # the character art faces the way the player last moved
+        if sprite_atlas().blit(surface, PLAYER_SPRITES[self.facing], rect):
+            return
         
-        for target in self.targets:
-            screen_x = self.offset_x + target[0] * TILE_SIZE
-            screen_y = self.offset_y + target[1] * TILE_SIZE
-            pygame.draw.rect(surface, GREEN, (screen_x + 5, screen_y + 5, TILE_SIZE - 10, TILE_SIZE - 10), border_radius=5)
-            pygame.draw.rect(surface, (50, 200, 50), (screen_x + 10, screen_y + 10, TILE_SIZE - 20, TILE_SIZE - 20), border_radius=3)
-        
-        for box in self.boxes:
-            screen_x = self.offset_x + box[0] * TILE_SIZE
-            screen_y = self.offset_y + box[1] * TILE_SIZE
-            
-            on_target = box in self.targets
-            box_color = (255, 200, 100) if on_target else ORANGE
-            
-            pygame.draw.rect(surface, box_color, (screen_x + 4, screen_y + 4, TILE_SIZE - 8, TILE_SIZE - 8), border_radius=5)
-            pygame.draw.rect(surface, DARK_BROWN, (screen_x + 4, screen_y + 4, TILE_SIZE - 8, TILE_SIZE - 8), 3, border_radius=5)
-            pygame.draw.line(surface, DARK_BROWN, (screen_x + 10, screen_y + 10), (screen_x + TILE_SIZE - 10, screen_y + TILE_SIZE - 10), 2)
-            pygame.draw.line(surface, DARK_BROWN, (screen_x + TILE_SIZE - 10, screen_y + 10), (screen_x + 10, screen_y + TILE_SIZE - 10), 2)
-        
-        screen_x = self.offset_x + self.player_pos[0] * TILE_SIZE
-        screen_y = self.offset_y + self.player_pos[1] * TILE_SIZE
-        
+        screen_x, screen_y = rect.topleft
         pygame.draw.circle(surface, BLUE, (screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE // 2), TILE_SIZE // 2 - 5)
         pygame.draw.circle(surface, CYAN, (screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE // 2), TILE_SIZE // 2 - 5, 3)
         pygame.draw.circle(surface, WHITE, (screen_x + TILE_SIZE // 2 - 8, screen_y + TILE_SIZE // 2 - 5), 5)
         pygame.draw.circle(surface, WHITE, (screen_x + TILE_SIZE // 2 + 8, screen_y + TILE_SIZE // 2 - 5), 5)
         pygame.draw.circle(surface, BLACK, (screen_x + TILE_SIZE // 2 - 8, screen_y + TILE_SIZE // 2 - 5), 2)
         pygame.draw.circle(surface, BLACK, (screen_x + TILE_SIZE // 2 + 8, screen_y + TILE_SIZE // 2 - 5), 2)
-        
-        help_text = font_tiny.render("Arrow keys to move | R to restart | ESC for menu", True, WHITE)
-        surface.blit(help_text, (SCREEN_WIDTH // 2 - help_text.get_width() // 2, SCREEN_HEIGHT - 30))
+    
+    def draw_hint(self, surface):
+        # outline the box to push and point into the cell it goes to
+        cells = self.hint_cells()
+        if not cells:
+            return
+        box, dest = cells
+        pygame.draw.rect(surface, YELLOW, self.cell_rect(box), 3)
+        dx, dy = DIRECTIONS[self.hint.direction]
+        cx, cy = self.cell_rect(dest).center
+        size = TILE_SIZE // 4
+        tip = (cx + dx * size, cy + dy * size)
+        left = (cx - dx * size + dy * size, cy - dy * size + dx * size)
+        right = (cx - dx * size - dy * size, cy - dy * size - dx * size)
+        pygame.draw.polygon(surface, YELLOW, (tip, left, right))
+    
+    def draw_hud(self, surface, background):
+        # restore whatever the previous HUD text covered, then draw the new one
+        rects = list(self.hud_rects)
+        for rect in rects:
+            surface.blit(background, rect, rect)
+        
+        moves_text = render_text(font_small, f"Moves: {self.moves}", True, WHITE)
+        self.hud_rects = [surface.blit(moves_text, (10, 10))]
+        
+        if self.deadlocked:
+            stuck_text = render_text(font_small, "A box is stuck! Press Z to undo or R to restart", True, RED)
+            self.hud_rects.append(surface.blit(stuck_text, (SCREEN_WIDTH // 2 - stuck_text.get_width() // 2, SCREEN_HEIGHT - 60)))
+        elif self.hint_message is not None:
+            hint_text = render_text(font_small, self.hint_message, True, YELLOW)
+            self.hud_rects.append(surface.blit(hint_text, (SCREEN_WIDTH // 2 - hint_text.get_width() // 2, SCREEN_HEIGHT - 60)))
+        
+        self.hud_state = self.current_hud_state()
+        return rects + self.hud_rects
+    
+    def current_hud_state(self):
+        return (self.moves, self.deadlocked, self.hint_message)
+    
+    def draw_viewport(self, surface, background):
+        # everything inside the viewport for a scrolling board: visible
+        # chunks, then only the boxes on visible tiles, then the player
+        board = self.board
+        surface.set_clip(VIEWPORT)
+        surface.blit(background, VIEWPORT, VIEWPORT)
+        x0, y0, x1, y1 = self.visible_tiles()
+        if x0 < x1 and y0 < y1:
+            for chunk_y in range(y0 // CHUNK_TILES, (y1 - 1) // CHUNK_TILES + 1):
+                for chunk_x in range(x0 // CHUNK_TILES, (x1 - 1) // CHUNK_TILES + 1):
+                    chunk = self.board_chunk(chunk_x, chunk_y, surface)
+                    surface.blit(chunk, (self.offset_x + chunk_x * CHUNK_TILES * TILE_SIZE,
+                                         self.offset_y + chunk_y * CHUNK_TILES * TILE_SIZE))
+            cells = board.cells
+            for y in range(y0, y1):
+                start = board.index(x0, y)
+                for cell in range(start, start + x1 - x0):
+                    if cells[cell] & BOX:
+                        self.draw_box(surface, cell)
+        self.draw_hint(surface)
+        self.draw_player(surface)
+        surface.set_clip(None)
+    
+    def draw(self, surface):
+        """Draw the board and return the changed rects, or None if the whole screen changed."""
+        background = self.background(surface)
+        board = self.board
+        camera_moved = self.scrolling and self.update_camera()
+        
+        if self.full_redraw or camera_moved:
+            if self.full_redraw:
+                surface.blit(background, (0, 0))
+                self.hud_rects = []
+                self.hud_state = None
+            if self.scrolling:
+                self.draw_viewport(surface, background)
+            else:
+                for box in board.box_cells:
+                    self.draw_box(surface, box)
+                self.draw_hint(surface)
+                self.draw_player(surface)
+            if self.hud_state != self.current_hud_state():
+                self.draw_hud(surface, background)
+            self.full_redraw = False
+            self.dirty_cells.clear()
+            return None
+        
+        rects = []
+        if self.scrolling:
+            surface.set_clip(VIEWPORT)
+        for cell in self.dirty_cells:
+            rect = self.restore_cell(surface, background, cell)
+            if rect is None:
+                continue
+            if board.cells[cell] & BOX:
+                self.draw_box(surface, cell)
+            rects.append(rect)
+        if self.dirty_cells:
+            if not self.dirty_cells.isdisjoint(self.hint_cells()):
+                self.draw_hint(surface)
+            self.draw_player(surface)
+            self.dirty_cells.clear()
+        surface.set_clip(None)
+        if self.hud_state != self.current_hud_state():
+            rects.extend(self.draw_hud(surface, background))
+        return rects
 
 class QuizScreen:
-    def __init__(self, gate_type):
+    def __init__(self, gate_type, difficulty=1, question_data=None):
         self.gate_type = gate_type
-        self.question_data = random.choice(QUIZ_QUESTIONS[gate_type])
+        # question_data comes from elsewhere (a server) when given
+        self.question_data = pick_question(gate_type, difficulty) if question_data is None else question_data
         self.selected_answer = None
         self.answered = False
         self.correct = False
@@ -469,16 +476,16 @@ class QuizScreen:
     def draw(self, surface):
         surface.fill(DARK_GRAY)
         
-        title = font_large.render(f"{self.gate_type} Gate Quiz!", True, YELLOW)
+        title = render_text(font_large, f"{self.gate_type} Gate Quiz!", True, YELLOW)
         surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
         
-        subtitle = font_small.render("Answer this question about the logic gate you just learned!", True, WHITE)
+        subtitle = render_text(font_small, "Answer this question about the logic gate you just learned!", True, WHITE)
         surface.blit(subtitle, (SCREEN_WIDTH // 2 - subtitle.get_width() // 2, 120))
         
         question_lines = self.wrap_text(self.question_data["question"], font_medium, 700)
         y = 180
         for line in question_lines:
-            q_text = font_medium.render(line, True, WHITE)
+            q_text = render_text(font_medium, line, True, WHITE)
             surface.blit(q_text, (SCREEN_WIDTH // 2 - q_text.get_width() // 2, y))
             y += 40
         
@@ -487,26 +494,14 @@ class QuizScreen:
                 btn.draw(surface)
         else:
             if self.correct:
-                result = font_large.render("Correct!", True, GREEN)
+                result = render_text(font_large, "Correct!", True, GREEN)
             else:
-                result = font_large.render(f"Wrong! Answer: {self.question_data['answer']}", True, RED)
+                result = render_text(font_large, f"Wrong! Answer: {self.question_data['answer']}", True, RED)
             surface.blit(result, (SCREEN_WIDTH // 2 - result.get_width() // 2, 350))
             self.continue_btn.draw(surface)
     
     def wrap_text(self, text, font, max_width):
-        words = text.split()
-        lines = []
-        current_line = ""
-        for word in words:
-            test_line = current_line + word + " "
-            if font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                lines.append(current_line.strip())
-                current_line = word + " "
-        if current_line:
-            lines.append(current_line.strip())
-        return lines
+        return wrap_text(text, font, max_width)
 
 class LessonScreen:
     def __init__(self, gate_type):
@@ -528,22 +523,22 @@ class LessonScreen:
         
         y = 30 + self.scroll_y
         
-        title = font_large.render(self.gate_info["name"], True, YELLOW)
+        title = render_text(font_large, self.gate_info["name"], True, YELLOW)
         surface.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, y))
         y += 70
         
-        symbol = font_medium.render(self.gate_info["symbol"], True, CYAN)
+        symbol = render_text(font_medium, self.gate_info["symbol"], True, CYAN)
         surface.blit(symbol, (SCREEN_WIDTH // 2 - symbol.get_width() // 2, y))
         y += 60
         
         desc_lines = self.wrap_text(self.gate_info["description"], font_small, 700)
         for line in desc_lines:
-            text = font_small.render(line, True, WHITE)
+            text = render_text(font_small, line, True, WHITE)
             surface.blit(text, (50, y))
             y += 35
         y += 20
         
-        tt_title = font_medium.render("Truth Table:", True, GREEN)
+        tt_title = render_text(font_medium, "Truth Table:", True, GREEN)
         surface.blit(tt_title, (50, y))
         y += 50
         
@@ -555,44 +550,44 @@ class LessonScreen:
             for col_idx, cell in enumerate(row):
                 cell_x = table_x + col_idx * col_width
                 color = CYAN if row_idx == 0 else WHITE
-                cell_text = font_small.render(cell, True, color)
+                cell_text = render_text(font_small, cell, True, color)
                 surface.blit(cell_text, (cell_x, y))
             y += 35
         y += 20
         
-        real_title = font_medium.render("Real World Example:", True, ORANGE)
+        real_title = render_text(font_medium, "Real World Example:", True, ORANGE)
         surface.blit(real_title, (50, y))
         y += 45
         
         real_lines = self.wrap_text(self.gate_info["real_world"], font_small, 700)
         for line in real_lines:
-            text = font_small.render(line, True, WHITE)
+            text = render_text(font_small, line, True, WHITE)
             surface.blit(text, (50, y))
             y += 35
         
         self.back_btn.draw(surface)
     
     def wrap_text(self, text, font, max_width):
-        words = text.split()
-        lines = []
-        current_line = ""
-        for word in words:
-            test_line = current_line + word + " "
-            if font.size(test_line)[0] <= max_width:
-                current_line = test_line
-            else:
-                lines.append(current_line.strip())
-                current_line = word + " "
-        if current_line:
-            lines.append(current_line.strip())
-        return lines
+        return wrap_text(text, font, max_width)
 
 class Game:
-    def __init__(self):
+    LEVELS_PER_PAGE = 9
+    
+    def __init__(self, levels=None, fps=60, idle=True, report_cpu=False, profiler=None, profile_path=None):
+        self.levels = LEVELS if levels is None else levels
+        self.fps = fps
+        self.idle = idle
+        self.report_cpu = report_cpu
+        self.profiler = profiler
+        self.profile_path = profile_path
         self.state = "menu"
         self.current_level = 0
+        self.level_page = 0
+        # why the last level could not be started, shown on the level select screen
+        self.notice = None
         self.completed_levels = set()
         self.sokoban_game = None
+        self.hints = None
         self.quiz_screen = None
         self.lesson_screen = None
         
@@ -603,6 +598,8 @@ class Game:
         self.level_buttons = []
         self.lesson_buttons = []
         self.back_btn = Button(50, SCREEN_HEIGHT - 70, 150, 50, "Back", RED, ORANGE)
+        self.prev_page_btn = Button(SCREEN_WIDTH - 330, SCREEN_HEIGHT - 70, 130, 50, "Prev", BLUE, CYAN)
+        self.next_page_btn = Button(SCREEN_WIDTH - 180, SCREEN_HEIGHT - 70, 130, 50, "Next", BLUE, CYAN)
         
         self.setup_level_buttons()
         self.setup_lesson_buttons()
@@ -611,28 +608,17 @@ class Game:
             pygame.mixer.init()
         except Exception:
             pass
-        self.menu_music_path = os.path.join('sounds', 'zil-sesi-433221.mp3')
-        self.menu_music_playing = False
-        self.prev_state = self.state
-        # load right-answer sound effect if present
-        self.right_answer_sound = None
-        right_path = os.path.join('sounds', 'right-answer.mp3')
-        try:
-            if os.path.isfile(right_path):
-                self.right_answer_sound = pygame.mixer.Sound(right_path)
-        except Exception:
-            self.right_answer_sound = None
-        # load wrong-answer (buzzer) sound effect if present
-        self.wrong_answer_sound = None
-        wrong_path = os.path.join('sounds', 'wrong-buzzer.mp3')
-        try:
-            if os.path.isfile(wrong_path):
-                self.wrong_answer_sound = pygame.mixer.Sound(wrong_path)
-        except Exception:
-            self.wrong_answer_sound = None
+        self.audio = AudioManager(assets, MENU_MUSIC)
+        # decode the music, sound effects and board art in the background
+        # while the menu is already up; the music starts once it is ready
+        assets.preload(images=art_files(), sounds=[MENU_MUSIC, RIGHT_ANSWER_SOUND, WRONG_ANSWER_SOUND])
     
     def setup_level_buttons(self):
+        # only the current page of levels gets buttons, so large packs are
+        # never parsed or laid out all at once
         self.level_buttons = []
+        self.first_level_on_page = self.level_page * self.LEVELS_PER_PAGE
+        last = min(len(self.levels), self.first_level_on_page + self.LEVELS_PER_PAGE)
         start_x = 100
         start_y = 180
         btn_width = 180
@@ -640,17 +626,19 @@ class Game:
         gap = 20
         cols = 3
         
-        for i in range(7):
+        for i in range(last - self.first_level_on_page):
             row = i // cols
             col = i % cols
             x = start_x + col * (btn_width + gap)
             y = start_y + row * (btn_height + gap)
-            btn = Button(x, y, btn_width, btn_height, f"Level {i + 1}", BLUE, CYAN)
+            btn = Button(x, y, btn_width, btn_height, f"Level {self.first_level_on_page + i + 1}", BLUE, CYAN)
             self.level_buttons.append(btn)
     
+    def page_count(self):
+        return max(1, -(-len(self.levels) // self.LEVELS_PER_PAGE))
+    
     def setup_lesson_buttons(self):
         self.lesson_buttons = []
-        gates = ["AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR"]
         start_x = 100
         start_y = 150
         btn_width = 180
@@ -658,7 +646,7 @@ class Game:
         gap = 15
         cols = 3
         
-        for i, gate in enumerate(gates):
+        for i, gate in enumerate(GATES):
             row = i // cols
             col = i % cols
             x = start_x + col * (btn_width + gap)
@@ -666,46 +654,92 @@ class Game:
             btn = Button(x, y, btn_width, btn_height, gate, PURPLE, CYAN)
             self.lesson_buttons.append(btn)
     
+    def is_animating(self):
+        return self.state == "playing" and self.sokoban_game.is_animating()
+    
+    def next_events(self, needs_redraw):
+        # In idle mode, sleep in the event queue until something happens
+        # instead of spinning at the frame cap; the timeout only bounds how
+        # long background state (e.g. music) goes unchecked.
+        if self.idle and not needs_redraw and not self.is_animating():
+            event = pygame.event.wait(IDLE_TIMEOUT_MS)
+            if event.type == pygame.NOEVENT:
+                return []
+            return [event] + pygame.event.get()
+        return pygame.event.get()
+    
     def run(self):
+        init_display()
         running = True
+        needs_redraw = True
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        frames = 0
+        profiler = self.profiler
         while running:
-            for event in pygame.event.get():
+            if profiler is not None:
+                profiler.start_frame()
+            events = self.next_events(needs_redraw)
+            if profiler is not None:
+                profiler.mark(WAIT)
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 
                 self.handle_event(event)
-            # handle state transitions for background music: only play in menu
-            if self.prev_state != self.state:
-                try:
-                    # stop any currently playing music first
-                    try:
-                        if pygame.mixer.music.get_busy():
-                            pygame.mixer.music.stop()
-                    except Exception:
-                        pass
+                needs_redraw = True
+            if profiler is not None:
+                profiler.mark(EVENTS)
+            # background music only plays in the menu; leaving pauses the
+            # decoded track and coming back resumes it where it was
+            try:
+                self.audio.update(self.state == "menu")
+            except Exception:
+                pass
+            if profiler is not None:
+                profiler.mark(TRANSITIONS)
 
-                    # If entering menu, loop the MP3 as background; otherwise keep music stopped
-                    if self.state == 'menu':
-                        if os.path.isfile(self.menu_music_path):
-                            pygame.mixer.music.load(self.menu_music_path)
-                            pygame.mixer.music.play(-1)
-                            self.menu_music_playing = True
-                        else:
-                            self.menu_music_playing = False
-                    else:
-                        self.menu_music_playing = False
-                except Exception:
-                    pass
-                self.prev_state = self.state
-
-            self.draw()
-            pygame.display.flip()
-            clock.tick(60)
-        
+            if needs_redraw or not self.idle or self.is_animating():
+                dirty_rects = self.draw()
+                if profiler is not None and profiler.show_overlay:
+                    overlay_rect = profiler.draw_overlay(screen, font_tiny, render_text)
+                    if dirty_rects is not None:
+                        dirty_rects.append(overlay_rect)
+                if profiler is not None:
+                    profiler.mark(DRAW)
+                if dirty_rects is None:
+                    pygame.display.flip()
+                elif dirty_rects:
+                    pygame.display.update(dirty_rects)
+                if profiler is not None:
+                    profiler.mark(FLIP)
+                needs_redraw = False
+                frames += 1
+            clock.tick(self.fps)
+            if profiler is not None:
+                profiler.mark(TICK)
+                profiler.end_frame(self.state)
+        
+        if profiler is not None and self.profile_path:
+            profiler.export(self.profile_path)
+        if self.report_cpu:
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            print(f"{frames} frames in {wall:.1f}s, CPU {cpu:.2f}s ({100 * cpu / max(wall, 1e-9):.1f}% of one core)")
+        self.stop_hints()
         pygame.quit()
         sys.exit()
     
     def handle_event(self, event):
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED) and self.sokoban_game:
+            self.sokoban_game.full_redraw = True
+        
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and self.profiler is not None:
+            self.profiler.show_overlay = not self.profiler.show_overlay
+            if self.sokoban_game:
+                self.sokoban_game.full_redraw = True
+            return
+        
         if self.state == "menu":
             if self.play_btn.handle_event(event):
                 self.start_level(self.current_level)
@@ -717,17 +751,25 @@ class Game:
         elif self.state == "level_select":
             if self.back_btn.handle_event(event):
                 self.state = "menu"
+            if self.page_count() > 1:
+                if self.prev_page_btn.handle_event(event) and self.level_page > 0:
+                    self.level_page -= 1
+                    self.setup_level_buttons()
+                    return
+                if self.next_page_btn.handle_event(event) and self.level_page < self.page_count() - 1:
+                    self.level_page += 1
+                    self.setup_level_buttons()
+                    return
             for i, btn in enumerate(self.level_buttons):
                 if btn.handle_event(event):
-                    self.start_level(i)
+                    self.start_level(self.first_level_on_page + i)
         
         elif self.state == "lessons":
             if self.back_btn.handle_event(event):
                 self.state = "menu"
-            gates = ["AND", "OR", "NOT", "NAND", "NOR", "XOR", "XNOR"]
             for i, btn in enumerate(self.lesson_buttons):
                 if btn.handle_event(event):
-                    self.lesson_screen = LessonScreen(gates[i])
+                    self.lesson_screen = LessonScreen(GATES[i])
                     self.state = "lesson_view"
         
         elif self.state == "lesson_view":
@@ -745,13 +787,24 @@ class Game:
                     self.sokoban_game.move_player(-1, 0)
                 elif event.key == pygame.K_RIGHT:
                     self.sokoban_game.move_player(1, 0)
+                elif event.key == pygame.K_z or event.key == pygame.K_BACKSPACE:
+                    self.sokoban_game.undo()
+                elif event.key == pygame.K_y:
+                    self.sokoban_game.redo()
                 elif event.key == pygame.K_r:
-                    self.sokoban_game.load_level()
+                    self.sokoban_game.restart()
+                elif event.key == pygame.K_h:
+                    self.sokoban_game.show_hint(self.hints.hint(self.sokoban_game.board))
                 elif event.key == pygame.K_ESCAPE:
+                    self.stop_hints()
                     self.state = "menu"
                 
+                if self.state == "playing" and event.key != pygame.K_h:
+                    self.update_hints()
                 if self.sokoban_game.check_win():
-                    self.quiz_screen = QuizScreen(self.sokoban_game.gate)
+                    self.stop_hints()
+                    self.save_replay()
+                    self.quiz_screen = QuizScreen(self.sokoban_game.gate, self.quiz_difficulty())
                     self.state = "quiz"
         
         elif self.state == "quiz":
@@ -760,12 +813,11 @@ class Game:
                 if result:
                     # play correct-answer sound if available
                     try:
-                        if self.right_answer_sound:
-                            self.right_answer_sound.play()
+                        self.audio.play_effect(RIGHT_ANSWER_SOUND)
                     except Exception:
                         pass
                     self.completed_levels.add(self.current_level)
-                    if self.current_level < 6:
+                    if self.current_level < len(self.levels) - 1:
                         self.current_level += 1
                         self.start_level(self.current_level)
                     else:
@@ -773,8 +825,7 @@ class Game:
                 else:
                     # play wrong-answer buzzer if available
                     try:
-                        if self.wrong_answer_sound:
-                            self.wrong_answer_sound.play()
+                        self.audio.play_effect(WRONG_ANSWER_SOUND)
                     except Exception:
                         pass
                     self.start_level(self.current_level)
@@ -783,12 +834,51 @@ class Game:
             if event.type == pygame.KEYDOWN or event.type == pygame.MOUSEBUTTONDOWN:
                 self.state = "menu"
     
+    def quiz_difficulty(self):
+        # harder questions as the player gets further through the levels
+        return 1 + self.current_level * 3 // max(len(self.levels), 1)
+    
+    def save_replay(self):
+        try:
+            Replay.from_game(self.sokoban_game).save(REPLAY_DIR)
+        except OSError:
+            pass
+    
     def start_level(self, level_index):
         self.current_level = level_index
-        self.sokoban_game = SokobanGame(level_index)
+        # packs from elsewhere can hold levels the game cannot run
+        problem = layout_problem(self.levels[level_index].get("layout"))
+        if problem is not None:
+            self.notice = f"Level {level_index + 1} cannot be played: {problem}"
+            self.level_page = level_index // self.LEVELS_PER_PAGE
+            self.setup_level_buttons()
+            self.stop_hints()
+            self.state = "level_select"
+            return
+        self.notice = None
+        self.sokoban_game = SokobanGame(level_index, self.levels)
         self.state = "playing"
+        # start solving right away so the first hint is usually ready
+        self.stop_hints()
+        self.hints = HintEngine(self.levels[level_index]["layout"])
+        self.hints.update(self.sokoban_game.board)
+    
+    def update_hints(self):
+        # tell the solver about the new position; a shown hint stays up
+        # while it still fits, which walking towards the box does
+        game = self.sokoban_game
+        self.hints.update(game.board)
+        if game.hint_message is not None and not game.hint_applies():
+            game.hide_hint()
+    
+    def stop_hints(self):
+        if self.hints is not None:
+            self.hints.close()
+            self.hints = None
     
     def draw(self):
+        # returns the changed rects when only part of the screen was redrawn,
+        # or None when the whole screen needs flipping
         if self.state == "menu":
             self.draw_menu()
         elif self.state == "level_select":
@@ -798,7 +888,7 @@ class Game:
         elif self.state == "lesson_view":
             self.lesson_screen.draw(screen)
         elif self.state == "playing":
-            self.sokoban_game.draw(screen)
+            return self.sokoban_game.draw(screen)
         elif self.state == "quiz":
             self.quiz_screen.draw(screen)
         elif self.state == "victory":
@@ -807,45 +897,55 @@ class Game:
     def draw_menu(self):
         screen.fill(DARK_GRAY)
         
-        title = font_large.render("Logic Gates Sokoban", True, YELLOW)
+        title = render_text(font_large, "Logic Gates Sokoban", True, YELLOW)
         screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 80))
         
-        subtitle = font_small.render("Learn Logic Gates Through Puzzles!", True, WHITE)
+        subtitle = render_text(font_small, "Learn Logic Gates Through Puzzles!", True, WHITE)
         screen.blit(subtitle, (SCREEN_WIDTH // 2 - subtitle.get_width() // 2, 160))
         
         self.play_btn.draw(screen)
         self.select_btn.draw(screen)
         self.lessons_btn.draw(screen)
         
-        progress = font_tiny.render(f"Completed: {len(self.completed_levels)}/7 Levels", True, GREEN)
+        progress = render_text(font_tiny, f"Completed: {len(self.completed_levels)}/{len(self.levels)} Levels", True, GREEN)
         screen.blit(progress, (SCREEN_WIDTH // 2 - progress.get_width() // 2, 520))
     
     def draw_level_select(self):
         screen.fill(DARK_GRAY)
         
-        title = font_large.render("Select Level", True, YELLOW)
+        title = render_text(font_large, "Select Level", True, YELLOW)
         screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
         
+        if self.notice is not None:
+            notice = render_text(font_tiny, self.notice, True, RED)
+            screen.blit(notice, (SCREEN_WIDTH // 2 - notice.get_width() // 2, 140))
+        
         for i, btn in enumerate(self.level_buttons):
-            if i in self.completed_levels:
+            level_index = self.first_level_on_page + i
+            if level_index in self.completed_levels:
                 btn.color = GREEN
             else:
                 btn.color = BLUE
             btn.draw(screen)
             
-            gate = LEVELS[i]["gate"]
-            gate_text = font_tiny.render(f"({gate})", True, WHITE)
+            gate = self.levels[level_index]["gate"]
+            gate_text = render_text(font_tiny, f"({gate})", True, WHITE)
             screen.blit(gate_text, (btn.rect.centerx - gate_text.get_width() // 2, btn.rect.bottom - 25))
         
         self.back_btn.draw(screen)
+        if self.page_count() > 1:
+            self.prev_page_btn.draw(screen)
+            self.next_page_btn.draw(screen)
+            page_text = render_text(font_tiny, f"Page {self.level_page + 1}/{self.page_count()}", True, WHITE)
+            screen.blit(page_text, (SCREEN_WIDTH - 190 - page_text.get_width() // 2, SCREEN_HEIGHT - 95))
     
     def draw_lessons(self):
         screen.fill(DARK_GRAY)
         
-        title = font_large.render("Logic Gates Lessons", True, YELLOW)
+        title = render_text(font_large, "Logic Gates Lessons", True, YELLOW)
         screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
         
-        subtitle = font_small.render("Click a gate to learn about it!", True, WHITE)
+        subtitle = render_text(font_small, "Click a gate to learn about it!", True, WHITE)
         screen.blit(subtitle, (SCREEN_WIDTH // 2 - subtitle.get_width() // 2, 110))
         
         for btn in self.lesson_buttons:
@@ -856,18 +956,38 @@ class Game:
     def draw_victory(self):
         screen.fill(DARK_GRAY)
         
-        title = font_large.render("Congratulations!", True, YELLOW)
+        title = render_text(font_large, "Congratulations!", True, YELLOW)
         screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 150))
         
-        message = font_medium.render("You've completed all levels!", True, GREEN)
+        message = render_text(font_medium, "You've completed all levels!", True, GREEN)
         screen.blit(message, (SCREEN_WIDTH // 2 - message.get_width() // 2, 250))
         
-        message2 = font_medium.render("You've learned about all 7 logic gates!", True, CYAN)
+        message2 = render_text(font_medium, "You've learned about all 7 logic gates!", True, CYAN)
         screen.blit(message2, (SCREEN_WIDTH // 2 - message2.get_width() // 2, 310))
         
-        continue_text = font_small.render("Click anywhere to return to menu", True, WHITE)
+        continue_text = render_text(font_small, "Click anywhere to return to menu", True, WHITE)
         screen.blit(continue_text, (SCREEN_WIDTH // 2 - continue_text.get_width() // 2, 420))
 
 if __name__ == "__main__":
-    game = Game()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Logic Gates Sokoban")
+    parser.add_argument("pack", nargs="?", help="optional .xsb/.sok collection or .json/.jsonl level pack to play")
+    parser.add_argument("--fps", type=int, default=60, help="frame cap while something is changing")
+    parser.add_argument("--busy-loop", action="store_true", help="redraw every frame like older versions")
+    parser.add_argument("--cpu-stats", action="store_true", help="print CPU use on exit")
+    parser.add_argument("--profile", action="store_true", help="time every frame (F3 toggles the overlay)")
+    parser.add_argument("--profile-out", help="write frame timings to this .csv or .json file on exit")
+    args = parser.parse_args()
+    
+    profiler = FrameProfiler() if args.profile or args.profile_out else None
+    levels = None
+    if args.pack and args.pack.endswith((".json", ".jsonl")):
+        from validate import iter_pack
+        levels = list(iter_pack(args.pack))
+    elif args.pack:
+        levels = LevelPack(args.pack)
+    game = Game(levels, fps=args.fps,
+                idle=not args.busy_loop, report_cpu=args.cpu_stats,
+                profiler=profiler, profile_path=args.profile_out)
     game.run()
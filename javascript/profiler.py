@@ -0,0 +1,123 @@
+"""Per-frame timing for Game.run.
+
+Each frame is split into phases (waiting for events, handling them, state
+transitions such as music, drawing, flipping and the frame-cap tick), and
+the durations go into a fixed-size ring buffer together with the screen that
+was drawn. The buffer never grows, so profiling can be left on for long
+sessions; when it is off Game.run only pays for a few "is None" checks.
+"""
+
+import csv
+import json
+import time
+from array import array
+
+PHASES = ("wait", "events", "transitions", "draw", "flip", "tick")
+WAIT, EVENTS, TRANSITIONS, DRAW, FLIP, TICK = range(len(PHASES))
+# phases that are time spent working rather than sleeping
+BUSY_PHASES = (EVENTS, TRANSITIONS, DRAW, FLIP)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    def __init__(self, capacity=1200):
+        self.capacity = capacity
+        self.samples = array("d", bytes(8 * capacity * len(PHASES)))
+        self.screens = [None] * capacity
+        self.count = 0
+        self.total_frames = 0
+        self.next_slot = 0
+        self.current = [0.0] * len(PHASES)
+        self.last = time.perf_counter()
+        self.summary_cache = None
+        self.show_overlay = False
+
+    def start_frame(self):
+        self.current = [0.0] * len(PHASES)
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self, screen_name):
+        base = self.next_slot * len(PHASES)
+        self.samples[base:base + len(PHASES)] = array("d", self.current)
+        self.screens[self.next_slot] = screen_name
+        self.next_slot = (self.next_slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.total_frames += 1
+        # the overlay refreshes its percentiles twice a second at 60 FPS
+        if self.total_frames % 30 == 0:
+            self.summary_cache = None
+
+    def frames(self):
+        # oldest first
+        start = (self.next_slot - self.count) % self.capacity
+        width = len(PHASES)
+        for i in range(self.count):
+            slot = (start + i) % self.capacity
+            yield self.screens[slot], self.samples[slot * width:(slot + 1) * width]
+
+    def summary(self):
+        """Percentiles in milliseconds for the busy frame time and every phase."""
+        if self.summary_cache is not None:
+            return self.summary_cache
+        columns = {name: [] for name in PHASES}
+        busy = []
+        draw_by_screen = {}
+        for screen_name, row in self.frames():
+            for name, value in zip(PHASES, row):
+                columns[name].append(value * 1000)
+            busy.append(sum(row[i] for i in BUSY_PHASES) * 1000)
+            draw_by_screen.setdefault(screen_name, []).append(row[DRAW] * 1000)
+
+        def stats(values):
+            values.sort()
+            return {"p50": percentile(values, 0.50), "p95": percentile(values, 0.95),
+                    "p99": percentile(values, 0.99)}
+
+        self.summary_cache = {
+            "frames": self.count,
+            "busy": stats(busy),
+            "phases": {name: stats(values) for name, values in columns.items()},
+            "draw_by_screen": {name: stats(values) for name, values in draw_by_screen.items()},
+        }
+        return self.summary_cache
+
+    def draw_overlay(self, surface, font, render_text):
+        busy = self.summary()["busy"]
+        lines = [
+            f"frames {self.total_frames}",
+            f"p50 {busy['p50']:.2f} ms",
+            f"p95 {busy['p95']:.2f} ms",
+            f"p99 {busy['p99']:.2f} ms",
+        ]
+        width, height = 170, 8 + 20 * len(lines)
+        rect = surface.fill((0, 0, 0), (surface.get_width() - width - 5, 45, width, height))
+        for i, line in enumerate(lines):
+            surface.blit(render_text(font, line, True, (255, 255, 100)), (rect.x + 6, rect.y + 4 + 20 * i))
+        return rect
+
+    def export(self, path):
+        self.summary_cache = None
+        if path.endswith(".json"):
+            data = dict(self.summary(), frames_ms=[
+                dict(screen=screen_name, **{name: value * 1000 for name, value in zip(PHASES, row)})
+                for screen_name, row in self.frames()
+            ])
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            return
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("screen",) + tuple(f"{name}_ms" for name in PHASES))
+            for screen_name, row in self.frames():
+                writer.writerow((screen_name,) + tuple(f"{value * 1000:.4f}" for value in row))
@@ -0,0 +1,255 @@
+"""Quiz questions generated from gate evaluation.
+
+Every answer is computed with gates.py, never typed in. Questions come in
+pools per gate and difficulty:
+
+    1  one gate, given inputs; which gate produces a two-input table
+    2  3- and 4-input gates; the gate combined with NOT; three-input tables
+    3  expressions of several gates; counting the rows that output 1
+
+The pools are generated in one batch from a fixed seed, de-duplicated by a
+hash of each question's content, and written to a JSON cache, so building
+a quiz is a dictionary lookup and a random.choice.
+
+Usage:
+    python quizgen.py            # rebuild the cache and print pool sizes
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+from functools import lru_cache
+
+from gates import GATE_NAMES, gate_column, output_at, output_bits, parse, truth_table
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".quiz-cache")
+# bump when the generators change so stale caches are rebuilt
+GENERATOR_VERSION = 1
+DIFFICULTIES = (1, 2, 3)
+POOL_SIZE = 60
+ATTEMPTS_PER_QUESTION = 20
+VARIABLES = "ABCD"
+
+
+def question_hash(question):
+    # option order is presentation only; it does not make a new question
+    content = json.dumps([question["question"], sorted(question["options"]), question["answer"]])
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _assignment_text(variables, row):
+    n = len(variables)
+    return ", ".join(f"{name}={(row >> (n - 1 - i)) & 1}" for i, name in enumerate(variables))
+
+
+def _bit_question(text, value):
+    return {"question": text, "options": ["0", "1"], "answer": str(value)}
+
+
+def _pick_options(answer, wrong, rng, count=3):
+    options = [answer] + rng.sample(wrong, min(count - 1, len(wrong)))
+    rng.shuffle(options)
+    return options
+
+
+def gate_inputs_question(gate, rng, n=None):
+    if n is None:
+        n = 1 if gate == "NOT" else 2
+    row = rng.randrange(1 << n)
+    value = output_at(gate_column(gate, n), row)
+    bits = [str((row >> (n - 1 - i)) & 1) for i in range(n)]
+    if n == 1:
+        return _bit_question(f"What is {gate} {bits[0]}?", value)
+    if n == 2:
+        return _bit_question(f"What is {bits[0]} {gate} {bits[1]}?", value)
+    return _bit_question(
+        f"What does a {n}-input {gate} gate output when {_assignment_text(VARIABLES[:n], row)}?", value)
+
+
+def which_gate_question(gate, rng, n=None):
+    if n is None:
+        n = 1 if gate == "NOT" else 2
+    if gate == "NOT":
+        n = 1
+    column = gate_column(gate, n)
+    # only gates whose table differs can be offered as wrong answers
+    wrong = [other for other in GATE_NAMES
+             if other != gate and (n == 1 or other != "NOT") and gate_column(other, n) != column]
+    variables = VARIABLES[:n]
+    rows = ", ".join(format(row, f"0{n}b") for row in range(1 << n))
+    outputs = ", ".join(output_bits(column, n))
+    return {
+        "question": f"Which gate outputs {outputs} for {variables} = {rows}?",
+        "options": _pick_options(gate, wrong, rng),
+        "answer": gate,
+    }
+
+
+def _random_operand(variables, rng, negate_chance):
+    name = rng.choice(variables)
+    return f"NOT {name}" if rng.random() < negate_chance else name
+
+
+def _random_expression(gate, variables, rng, depth):
+    # the quizzed gate is always at the root
+    def pair(level):
+        # two operands over different variables, so there is no
+        # "B OR NOT B" that does not depend on its inputs
+        left = operand(level)
+        right = operand(level)
+        while parse(left)[0] == parse(right)[0]:
+            right = operand(level)
+        return left, right
+
+    def operand(level):
+        if level == 0 or rng.random() < 0.3:
+            return _random_operand(variables, rng, 0.35)
+        inner = rng.choice([g for g in GATE_NAMES if g != "NOT"])
+        left, right = pair(level - 1)
+        return f"({left} {inner} {right})"
+
+    left, right = pair(depth - 1)
+    if gate == "NOT":
+        inner = rng.choice([g for g in GATE_NAMES if g != "NOT"])
+        return f"NOT ({left} {inner} {right})"
+    return f"{left} {gate} {right}"
+
+
+def _expression_table(expression, variables):
+    # only the variables the expression actually uses, in their usual order
+    found = parse(expression)[0]
+    return truth_table(expression, [name for name in variables if name in found])
+
+
+def expression_question(gate, rng, variable_count, depth):
+    variables = list(VARIABLES[:variable_count])
+    expression = _random_expression(gate, variables, rng, depth)
+    variables, column = _expression_table(expression, variables)
+    row = rng.randrange(1 << len(variables))
+    return _bit_question(
+        f"What is {expression} when {_assignment_text(variables, row)}?", output_at(column, row))
+
+
+def count_question(gate, rng):
+    if gate == "NOT" or rng.random() < 0.5:
+        variables = list(VARIABLES[:3])
+        expression = _random_expression(gate, variables, rng, 2)
+        variables = _expression_table(expression, variables)[0]
+        subject = expression
+    else:
+        n = rng.choice((3, 4))
+        variables = list(VARIABLES[:n])
+        expression = f"{gate}({', '.join(variables)})"
+        subject = f"a {n}-input {gate} gate"
+    variables, column = truth_table(expression, variables)
+    rows = 1 << len(variables)
+    answer = bin(column).count("1")
+    wrong = [str(value) for value in range(rows + 1) if value != answer and abs(value - answer) <= 3]
+    return {
+        "question": f"For how many of the {rows} input combinations does {subject} output 1?",
+        "options": _pick_options(str(answer), wrong, rng),
+        "answer": str(answer),
+    }
+
+
+def generate_question(gate, difficulty, rng):
+    if difficulty == 1:
+        if rng.random() < 0.7:
+            return gate_inputs_question(gate, rng)
+        return which_gate_question(gate, rng)
+    if difficulty == 2:
+        kind = rng.randrange(3)
+        if kind == 0 and gate != "NOT":
+            return gate_inputs_question(gate, rng, rng.choice((3, 4)))
+        if kind == 1 and gate != "NOT":
+            return which_gate_question(gate, rng, 3)
+        return expression_question(gate, rng, 2, 1 if gate != "NOT" else 2)
+    if rng.random() < 0.3:
+        return count_question(gate, rng)
+    return expression_question(gate, rng, rng.choice((3, 4)), 2)
+
+
+def build_pools(seed=0, pool_size=POOL_SIZE):
+    """{gate: {difficulty: [question, ...]}} with no two questions alike.
+
+    Small question spaces (NOT at difficulty 1 has only a handful) stop
+    early instead of spinning forever.
+    """
+    rng = random.Random(seed)
+    pools = {}
+    for gate in GATE_NAMES:
+        pools[gate] = {}
+        for difficulty in DIFFICULTIES:
+            seen = set()
+            pool = []
+            misses = 0
+            while len(pool) < pool_size and misses < ATTEMPTS_PER_QUESTION * pool_size:
+                question = generate_question(gate, difficulty, rng)
+                key = question_hash(question)
+                if key in seen:
+                    misses += 1
+                    continue
+                seen.add(key)
+                pool.append(question)
+            pools[gate][difficulty] = pool
+    return pools
+
+
+def cache_path(seed=0, pool_size=POOL_SIZE):
+    return os.path.join(CACHE_DIR, f"pools-v{GENERATOR_VERSION}-{seed}-{pool_size}.json")
+
+
+def load_pools(seed=0, pool_size=POOL_SIZE, path=None):
+    """Read the cached pools, generating and saving them on first use."""
+    if path is None:
+        path = cache_path(seed, pool_size)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {gate: {int(d): pool for d, pool in by_difficulty.items()}
+                for gate, by_difficulty in data.items()}
+    except (OSError, ValueError):
+        pass
+
+    pools = build_pools(seed, pool_size)
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(pools, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+    return pools
+
+
+@lru_cache(maxsize=1)
+def question_pools():
+    return load_pools()
+
+
+def pick_question(gate, difficulty=1, rng=random):
+    difficulty = min(max(difficulty, DIFFICULTIES[0]), DIFFICULTIES[-1])
+    return rng.choice(question_pools()[gate][difficulty])
+
+
+def main():
+    path = cache_path()
+    if os.path.exists(path):
+        os.remove(path)
+    pools = load_pools()
+    for gate, by_difficulty in pools.items():
+        sizes = "  ".join(f"{d}: {len(pool):3d}" for d, pool in by_difficulty.items())
+        print(f"{gate:5s} {sizes}")
+    print(f"wrote {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Compact solution replays and a headless batch verifier.
+
+A replay file is a 32-byte header followed by the moves packed four to a
+byte (2 bits each, first move in the low bits):
+
+    magic "LGRP", version, level hash (board.layout_hash), unix timestamp,
+    move count
+
+Verification only uses board.Board, never pygame, so it can run in worker
+processes without a display.
+
+Usage:
+    python replay.py verify replays/              # against the shipped LEVELS
+    python replay.py verify replays/ --pack big.xsb -j 8
+    python replay.py show replays/some.lgr
+"""
+
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board, DIRECTION_CHARS, layout_hash
+
+MAGIC = b"LGRP"
+VERSION = 1
+HEADER = struct.Struct("<4sB3x8sQI4x")
+EXTENSION = ".lgr"
+
+
+def pack_moves(directions):
+    packed = bytearray((len(directions) + 3) // 4)
+    for i, direction in enumerate(directions):
+        packed[i >> 2] |= direction << ((i & 3) * 2)
+    return bytes(packed)
+
+
+# each packed byte expands to the four directions it holds
+_UNPACK = [bytes((b >> shift) & 3 for shift in (0, 2, 4, 6)) for b in range(256)]
+
+
+def unpack_moves(packed, count):
+    return b"".join([_UNPACK[b] for b in packed])[:count]
+
+
+class Replay:
+    def __init__(self, level_hash, directions, timestamp=None):
+        self.level_hash = level_hash
+        self.directions = bytes(directions)
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+
+    @classmethod
+    def from_game(cls, sokoban_game):
+        # the undo log already holds the effective moves; drop the pushed bits
+        layout = sokoban_game.levels[sokoban_game.level_index]["layout"]
+        return cls(layout_hash(layout), bytes(code & 3 for code in sokoban_game.history))
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, self.level_hash, self.timestamp, len(self.directions))
+        return header + pack_moves(self.directions)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, level_hash, timestamp, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a replay file")
+        packed = data[HEADER.size:]
+        if len(packed) != (count + 3) // 4:
+            raise ValueError("truncated replay")
+        return cls(level_hash, unpack_moves(packed, count), timestamp)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        stem = f"{self.level_hash.hex()}-{self.timestamp}-{len(self.directions)}"
+        data = self.to_bytes()
+        # the same level solved in as many moves within a second gets the
+        # same stem; number the later ones instead of overwriting
+        suffix = ""
+        attempt = 1
+        while True:
+            path = os.path.join(directory, stem + suffix + EXTENSION)
+            try:
+                with open(path, "xb") as f:
+                    f.write(data)
+                return path
+            except FileExistsError:
+                attempt += 1
+                suffix = f"-{attempt}"
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def moves_text(self):
+        return "".join(DIRECTION_CHARS[d] for d in self.directions)
+
+
+class Verifier:
+    """Replays recordings against known levels, reusing one board per level."""
+
+    def __init__(self, levels):
+        self.layouts = {layout_hash(level["layout"]): level["layout"] for level in levels}
+        self.boards = {}
+
+    def verify(self, replay):
+        entry = self.boards.get(replay.level_hash)
+        if entry is None:
+            layout = self.layouts.get(replay.level_hash)
+            if layout is None:
+                return "unknown-level"
+            board = Board(layout)
+            entry = self.boards[replay.level_hash] = (board, board.snapshot())
+        board, start = entry
+        board.restore(start)
+        move = board.move
+        for direction in replay.directions:
+            if not move(direction):
+                return "invalid"
+        return "valid" if board.is_solved() else "invalid"
+
+    def verify_file(self, path):
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError, struct.error):
+            return "corrupt"
+        return self.verify(replay)
+
+
+_worker_verifier = None
+
+
+def _init_worker(pack):
+    global _worker_verifier
+    _worker_verifier = Verifier(_load_levels(pack))
+
+
+def _verify_chunk(paths):
+    return [(path, _worker_verifier.verify_file(path)) for path in paths]
+
+
+def _load_levels(pack):
+    if pack is None:
+        from levels import LEVELS
+        return LEVELS
+    from validate import iter_pack
+    return iter_pack(pack)
+
+
+def iter_replay_paths(targets):
+    for target in targets:
+        if os.path.isdir(target):
+            for entry in os.scandir(target):
+                if entry.name.endswith(EXTENSION):
+                    yield entry.path
+        else:
+            yield target
+
+
+def verify_paths(paths, pack=None, workers=None, chunk_size=2000):
+    """Yield (path, status) for every replay, fanned out over a process pool."""
+    workers = workers or os.cpu_count() or 1
+    chunks = []
+    chunk = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) == chunk_size:
+            chunks.append(chunk)
+            chunk = []
+    if chunk:
+        chunks.append(chunk)
+
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(pack)
+        for chunk in chunks:
+            yield from _verify_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pack,)) as pool:
+        for results in pool.map(_verify_chunk, chunks):
+            yield from results
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect and verify solution replays.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify_cmd = sub.add_parser("verify", help="check that replays solve their levels")
+    verify_cmd.add_argument("targets", nargs="+", help="replay files or directories")
+    verify_cmd.add_argument("--pack", help="level pack the replays were recorded on (default: shipped LEVELS)")
+    verify_cmd.add_argument("-j", "--workers", type=int, default=None)
+    show_cmd = sub.add_parser("show", help="print a replay")
+    show_cmd.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        replay = Replay.load(args.path)
+        print(f"level {replay.level_hash.hex()}, recorded {time.ctime(replay.timestamp)}, "
+              f"{len(replay.directions)} moves")
+        print(replay.moves_text())
+        return 0
+
+    start = time.perf_counter()
+    counts = {}
+    for path, status in verify_paths(iter_replay_paths(args.targets), args.pack, args.workers):
+        counts[status] = counts.get(status, 0) + 1
+        if status != "valid":
+            print(f"{status}: {path}")
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"{sum(counts.values())} replays in {time.perf_counter() - start:.2f}s: {summary}", file=sys.stderr)
+    return 0 if set(counts) <= {"valid"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
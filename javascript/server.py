@@ -0,0 +1,325 @@
+"""Classroom server: many students' games in one asyncio process.
+
+Every connected student gets a Session holding a core.SokobanRules (the
+board as a bytearray plus a one-byte-per-move history), so a session costs
+a few kilobytes and no pygame. Clients render locally with the same rules
+and only ever receive what changed.
+
+The protocol is one JSON object per line over TCP. Client requests:
+
+    {"type": "hello", "name": "Ana"}      -> welcome
+    {"type": "start", "level": 0}         -> level
+    {"type": "move", "dir": 0}            -> delta    (board.DIRECTIONS index)
+    {"type": "undo"} / "redo" / "restart" -> delta
+    {"type": "answer", "choice": "1"}     -> result, then level or finished
+    {"type": "sync"}                      -> level, with the moves so far
+    {"type": "watch"}                     -> sessions, then every event
+
+A delta is {"type": "delta", "op": ..., "code": ..., "moves": ...}: op is
+the rules method the client calls to follow along ("move", "undo",
+"redo", "restart", or "none" when nothing changed), code is the move
+code (board.move_code) the server recorded for a move or redo, and moves
+the count after it, so a client can tell it has fallen out of step. Solving a level is followed by a
+quiz message; its answer stays on the server until the student replies.
+A request that cannot be served gets {"type": "error", "error": ...} and
+the connection stays open.
+
+Watchers (a teacher's screen) get every session's deltas, level changes
+and quiz results tagged with the session id. A watcher that stops reading
+is dropped instead of being buffered for.
+
+Usage:
+    python server.py                      # shipped LEVELS on 127.0.0.1:8765
+    python server.py pack.jsonl --host 0.0.0.0
+    python client.py --name Ana
+    python loadtest.py -n 300
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from board import DIRECTIONS, layout_problem
+from core import SokobanRules
+from levels import LEVELS
+from quizgen import pick_question, question_pools
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE = 64 * 1024
+# bytes queued for a watcher before it is given up on
+WATCHER_BUFFER_LIMIT = 1 << 20
+
+
+def encode(message):
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class Session:
+    def __init__(self, session_id, name, writer):
+        self.id = session_id
+        self.name = name
+        self.writer = writer
+        self.game = None
+        self.question = None
+        self.completed = set()
+
+    @property
+    def level(self):
+        return None if self.game is None else self.game.level_index
+
+
+class GameServer:
+    def __init__(self, levels=None):
+        self.levels = LEVELS if levels is None else levels
+        self.sessions = {}
+        self.watchers = set()
+        self.next_id = 1
+        self.requests = 0
+        self.handlers = {
+            "hello": self.on_hello,
+            "start": self.on_start,
+            "move": self.on_move,
+            "undo": self.on_undo,
+            "redo": self.on_redo,
+            "restart": self.on_restart,
+            "answer": self.on_answer,
+            "sync": self.on_sync,
+            "watch": self.on_watch,
+        }
+
+    async def handle(self, reader, writer):
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # line over MAX_LINE, or the client went away
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    handler = self.handlers[message["type"]]
+                except (ValueError, KeyError, TypeError):
+                    writer.write(encode({"type": "error", "error": "bad request"}))
+                    continue
+                self.requests += 1
+                if session is None and handler not in (self.on_hello, self.on_watch):
+                    writer.write(encode({"type": "error", "error": "say hello first"}))
+                    continue
+                try:
+                    result = handler(session, message, writer)
+                except Exception as e:
+                    # a bug or a bad level in the pack; the student keeps
+                    # the connection and whatever state they had
+                    print(f"{message['type']} failed: {type(e).__name__}: {e}", file=sys.stderr)
+                    writer.write(encode({"type": "error", "error": f"{message['type']} failed"}))
+                    result = None
+                if isinstance(result, Session):
+                    session = result
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if session is not None:
+                del self.sessions[session.id]
+                self.broadcast({"type": "left", "session": session.id})
+            self.watchers.discard(writer)
+            writer.close()
+
+    def send(self, session, message):
+        session.writer.write(encode(message))
+
+    def broadcast(self, message):
+        if not self.watchers:
+            return
+        data = encode(message)
+        for writer in list(self.watchers):
+            if writer.transport.get_write_buffer_size() > WATCHER_BUFFER_LIMIT:
+                self.watchers.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+    def level_message(self, session, history=False):
+        game = session.game
+        level = self.levels[game.level_index]
+        message = {
+            "type": "level",
+            "index": game.level_index,
+            "name": level["name"],
+            "gate": level["gate"],
+            "layout": level["layout"],
+        }
+        if history:
+            message["history"] = game.history.hex()
+        return message
+
+    def start_level(self, session, index):
+        session.game = SokobanRules(index, self.levels)
+        session.question = None
+        self.send(session, self.level_message(session))
+        self.broadcast({"type": "level", "session": session.id, "index": index})
+
+    def on_hello(self, session, message, writer):
+        if session is not None:
+            self.send(session, {"type": "error", "error": "already said hello"})
+            return None
+        session = Session(self.next_id, str(message.get("name", ""))[:40], writer)
+        self.next_id += 1
+        self.sessions[session.id] = session
+        self.send(session, {"type": "welcome", "session": session.id, "levels": len(self.levels)})
+        self.broadcast({"type": "joined", "session": session.id, "name": session.name})
+        return session
+
+    def on_start(self, session, message, writer):
+        index = message.get("level", 0)
+        # bool is an int subclass, and true is not a level
+        if type(index) is not int or not 0 <= index < len(self.levels):
+            self.send(session, {"type": "error", "error": "no such level"})
+            return
+        problem = layout_problem(self.levels[index].get("layout"))
+        if problem is not None:
+            self.send(session, {"type": "error", "error": f"level cannot be played: {problem}"})
+            return
+        self.start_level(session, index)
+
+    def delta(self, session, op, code=None):
+        message = {"type": "delta", "op": op}
+        if code is not None:
+            message["code"] = code
+        if op != "none":
+            message["moves"] = session.game.moves
+        self.send(session, message)
+        if op != "none":
+            message["session"] = session.id
+            self.broadcast(message)
+
+    def playing(self, session):
+        return session.game is not None and session.question is None
+
+    def on_move(self, session, message, writer):
+        direction = message.get("dir")
+        if not self.playing(session) or type(direction) is not int or direction not in (0, 1, 2, 3):
+            self.delta(session, "none")
+            return
+        game = session.game
+        if not game.move_player(*DIRECTIONS[direction]):
+            self.delta(session, "none")
+            return
+        self.delta(session, "move", game.history[-1])
+        if game.check_win():
+            self.ask_question(session)
+
+    def on_undo(self, session, message, writer):
+        if self.playing(session) and session.game.undo():
+            self.delta(session, "undo")
+        else:
+            self.delta(session, "none")
+
+    def on_redo(self, session, message, writer):
+        if not self.playing(session) or not session.game.redo():
+            self.delta(session, "none")
+            return
+        self.delta(session, "redo", session.game.history[-1])
+        if session.game.check_win():
+            self.ask_question(session)
+
+    def on_restart(self, session, message, writer):
+        if self.playing(session):
+            session.game.restart()
+            self.delta(session, "restart")
+        else:
+            self.delta(session, "none")
+
+    def quiz_difficulty(self, session):
+        # same progression as logicgames.Game
+        return 1 + session.level * 3 // max(len(self.levels), 1)
+
+    def ask_question(self, session):
+        session.question = pick_question(session.game.gate, self.quiz_difficulty(session))
+        self.send(session, {
+            "type": "quiz",
+            "gate": session.game.gate,
+            "question": session.question["question"],
+            "options": session.question["options"],
+        })
+
+    def on_answer(self, session, message, writer):
+        question = session.question
+        if question is None:
+            self.send(session, {"type": "error", "error": "no question asked"})
+            return
+        correct = message.get("choice") == question["answer"]
+        index = session.level
+        self.send(session, {"type": "result", "correct": correct, "answer": question["answer"]})
+        self.broadcast({"type": "result", "session": session.id, "level": index, "correct": correct})
+        if not correct:
+            self.start_level(session, index)
+            return
+        session.completed.add(index)
+        if index + 1 < len(self.levels):
+            self.start_level(session, index + 1)
+        else:
+            session.game = None
+            session.question = None
+            self.send(session, {"type": "finished", "completed": len(session.completed)})
+
+    def on_sync(self, session, message, writer):
+        if session.game is None:
+            self.send(session, {"type": "error", "error": "no level started"})
+            return
+        self.send(session, self.level_message(session, history=True))
+
+    def on_watch(self, session, message, writer):
+        self.watchers.add(writer)
+        writer.write(encode({
+            "type": "sessions",
+            "sessions": [{"session": s.id, "name": s.name, "level": s.level,
+                          "moves": 0 if s.game is None else s.game.moves}
+                         for s in self.sessions.values()],
+        }))
+
+
+async def serve(server, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    listener = await asyncio.start_server(server.handle, host, port, limit=MAX_LINE)
+    if ready is not None:
+        ready(listener)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many students' games in one process.")
+    parser.add_argument("pack", nargs="?", help="optional .xsb/.sok collection or .json/.jsonl level pack")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    levels = None
+    if args.pack and args.pack.endswith((".json", ".jsonl")):
+        from validate import iter_pack
+        levels = list(iter_pack(args.pack))
+    elif args.pack:
+        from levelpack import LevelPack
+        levels = LevelPack(args.pack)
+    server = GameServer(levels)
+    # build the quiz pools now rather than on the first solved level
+    question_pools()
+
+    def ready(listener):
+        address = listener.sockets[0].getsockname()
+        print(f"serving {len(server.levels)} levels on {address[0]}:{address[1]}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(serve(server, args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
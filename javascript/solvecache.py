@@ -0,0 +1,214 @@
+"""Persistent cache of solver work, keyed by a hash of the layout.
+
+A level that has been solved once is never solved again: its result
+(status, solution and the search summary: nodes expanded, transposition
+table size and time taken) is stored, and so are the tables the solver
+builds before searching, the dead squares and per-target push distances.
+The table build is what dominates on big boards.
+
+Everything lives in one SQLite file in WAL mode, so the game, the hint
+worker and every validator process can read and write it at the same
+time. Rows are keyed by board.layout_hash(); when the file grows past its
+size limit the least recently used rows are dropped. A lookup is a primary
+key read, well under a millisecond.
+
+Usage:
+    python solvecache.py             # show what is cached
+    python solvecache.py --clear
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from array import array
+
+from board import layout_hash
+from deadlock import DeadlockTables
+from solver import SolveResult, Solver
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".solve-cache")
+# bump when the stored format or the solver's results change
+CACHE_VERSION = 2
+MAX_BYTES = 64 * 1024 * 1024
+# a read only refreshes a row's last-used time if it is older than this,
+# so lookups do not turn into writes
+TOUCH_INTERVAL = 3600.0
+# only complete answers are worth keeping; "budget" depends on the budget
+FINAL_STATUSES = ("solved", "unsolvable")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB NOT NULL,
+    kind TEXT NOT NULL,
+    value BLOB NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (key, kind)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+"""
+
+
+def cache_path():
+    return os.path.join(CACHE_DIR, f"solver-v{CACHE_VERSION}.sqlite")
+
+
+class SolveCache:
+    def __init__(self, path=None, max_bytes=MAX_BYTES):
+        self.path = cache_path() if path is None else path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # the timeout is how long a writer waits for another process's write
+        self.db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.page_size = self.db.execute("PRAGMA page_size").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+    def get(self, key, kind):
+        row = self.db.execute("SELECT value, used FROM entries WHERE key = ? AND kind = ?", (key, kind)).fetchone()
+        if row is None:
+            return None
+        value, used = row
+        now = time.time()
+        if now - used > TOUCH_INTERVAL:
+            try:
+                self.db.execute("UPDATE entries SET used = ? WHERE key = ? AND kind = ?", (now, key, kind))
+            except sqlite3.OperationalError:
+                # another process holds the write lock for too long; the
+                # row just looks a little older than it is
+                pass
+        return value
+
+    def put(self, key, kind, value):
+        # best effort: losing a write to a busy database only costs a
+        # recomputation later
+        try:
+            self.db.execute("INSERT OR REPLACE INTO entries (key, kind, value, used) VALUES (?, ?, ?, ?)",
+                            (key, kind, value, time.time()))
+            if self.size() > self.max_bytes:
+                self.evict()
+        except sqlite3.OperationalError:
+            pass
+
+    def size(self):
+        """Bytes in use, not counting free pages left behind by deletes."""
+        pages = self.db.execute("PRAGMA page_count").fetchone()[0]
+        free = self.db.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * self.page_size
+
+    def evict(self, target=None):
+        # drop the least recently used tenth at a time until under target
+        target = self.max_bytes * 9 // 10 if target is None else target
+        while self.size() > target:
+            count = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if not count:
+                break
+            self.db.execute("DELETE FROM entries WHERE (key, kind) IN "
+                            "(SELECT key, kind FROM entries ORDER BY used LIMIT ?)", (max(1, count // 10),))
+
+    def clear(self):
+        self.db.execute("DELETE FROM entries")
+        self.db.execute("VACUUM")
+
+    def solution(self, layout):
+        """The stored SolveResult for a layout's start position, or None."""
+        value = self.get(layout_hash(layout), "solution")
+        if value is None:
+            return None
+        data = json.loads(value)
+        return SolveResult(data["status"], data["solution"], data["nodes"], data["elapsed"],
+                           table_size=data["table_size"], cached=True)
+
+    def store_solution(self, layout, result):
+        if result.status not in FINAL_STATUSES:
+            return
+        data = {
+            "status": result.status,
+            "solution": result.solution,
+            "nodes": result.nodes,
+            "elapsed": result.elapsed,
+            "table_size": result.table_size,
+        }
+        self.put(layout_hash(layout), "solution", json.dumps(data).encode("utf-8"))
+
+    def tables(self, layout):
+        """(deadlock tables, per-target distances) stored for a layout, or None."""
+        value = self.get(layout_hash(layout), "tables")
+        if value is None:
+            return None
+        values = array("i")
+        values.frombytes(zlib.decompress(value))
+        size = values.pop()
+        rows = [values[i:i + size].tolist() for i in range(0, len(values), size)]
+        return DeadlockTables(layout, rows[0]), rows[1:]
+
+    def store_tables(self, layout, distances, target_distances):
+        # one flat int array, nearest-target distances first; the row
+        # length goes last
+        values = array("i", distances)
+        for table in target_distances:
+            values.extend(table)
+        values.append(len(distances))
+        self.put(layout_hash(layout), "tables", zlib.compress(values.tobytes()))
+
+    def stats(self):
+        rows = self.db.execute("SELECT kind, COUNT(*), SUM(LENGTH(value)) FROM entries GROUP BY kind").fetchall()
+        return {kind: (count, size) for kind, count, size in rows}
+
+
+_default = None
+_default_pid = None
+
+
+def default_cache():
+    """This process's SolveCache on the default path, or None if it cannot be opened."""
+    global _default, _default_pid
+    # a connection must not cross a fork, so every process opens its own
+    if _default_pid != os.getpid():
+        _default_pid = os.getpid()
+        try:
+            _default = SolveCache()
+        except (OSError, sqlite3.Error):
+            _default = None
+    return _default
+
+
+def solve(layout, cache=None, max_table_size=2_000_000, **kwargs):
+    """Solver(layout).solve(**kwargs), answered from cache when it can be."""
+    # stored solutions are from the level's start position only
+    from_start = kwargs.get("boxes") is None and kwargs.get("player") is None
+    if cache is not None and from_start:
+        result = cache.solution(layout)
+        if result is not None:
+            return result
+    result = Solver(layout, max_table_size=max_table_size, cache=cache).solve(**kwargs)
+    if cache is not None and from_start:
+        cache.store_solution(layout, result)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the persistent solver cache.")
+    parser.add_argument("--clear", action="store_true", help="remove every entry")
+    args = parser.parse_args(argv)
+
+    cache = SolveCache()
+    if args.clear:
+        cache.clear()
+    for kind, (count, size) in sorted(cache.stats().items()):
+        print(f"{kind:9s} {count:6d} entries, {size / 1024:.0f} KiB")
+    print(f"{cache.path}: {cache.size() / 1024:.0f} KiB in use, limit {cache.max_bytes / 1024 / 1024:.0f} MiB")
+    cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
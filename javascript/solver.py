@@ -0,0 +1,312 @@
+"""Push-optimal Sokoban solver for layouts in the LEVELS format.
+
+Runs A* over box pushes. States are keyed by a Zobrist hash of the box cells
+plus the player's normalized position (the lowest cell index the player can
+reach), so positions that only differ by walking around are merged. Seen
+states live in a bounded transposition table, and pushes into dead squares
+or frozen 2x2 blocks are pruned using the cached tables from deadlock.py.
+
+Usage:
+    python solver.py                 # solve every shipped level
+    python solver.py --level 3       # solve one level (1-based)
+    python solver.py --json          # machine-readable stats
+"""
+
+import heapq
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+from board import Board, WALL, DIRECTION_CHARS
+from deadlock import INFINITY, deadlock_tables, pull_distances
+
+# Largest box count for which the heuristic solves the exact assignment.
+MATCHING_LIMIT = 8
+
+
+class SolveResult:
+    def __init__(self, status, solution="", nodes=0, elapsed=0.0, peak_memory=0, table_size=0, cached=False):
+        # status is one of "solved", "unsolvable", "budget" or "cancelled"
+        self.status = status
+        self.solution = solution
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.peak_memory = peak_memory
+        self.table_size = table_size
+        # read back from a solvecache.SolveCache; nodes and elapsed are
+        # from the original search
+        self.cached = cached
+
+    @property
+    def solved(self):
+        return self.status == "solved"
+
+    @property
+    def moves(self):
+        return len(self.solution)
+
+    @property
+    def pushes(self):
+        return sum(1 for c in self.solution if c.isupper())
+
+    def as_dict(self):
+        return {
+            "status": self.status,
+            "solution": self.solution,
+            "moves": self.moves,
+            "pushes": self.pushes,
+            "nodes": self.nodes,
+            "elapsed": round(self.elapsed, 6),
+            "peak_memory": self.peak_memory,
+            "table_size": self.table_size,
+            "cached": self.cached,
+        }
+
+
+class Solver:
+    def __init__(self, layout, max_table_size=2_000_000, seed=0, cache=None):
+        self.board = Board(layout)
+        board = self.board
+        self.deltas = board.deltas
+        self.max_table_size = max_table_size
+        # the tables can come from a solvecache.SolveCache; building them is
+        # most of the setup time on big boards
+        stored = cache.tables(layout) if cache is not None else None
+        if stored is not None:
+            self.deadlocks, self.target_distances = stored
+        else:
+            self.deadlocks = deadlock_tables(layout)
+            self.target_distances = [pull_distances(self.deadlocks.static, self.deltas, (t,)) for t in board.targets]
+            if cache is not None:
+                cache.store_tables(layout, self.deadlocks.distances, self.target_distances)
+        # Static grid: walls and targets only, boxes live in the search state.
+        self.static = self.deadlocks.static
+        self.targets = frozenset(board.targets)
+        self.distances = self.deadlocks.distances
+        self.bound_cache = {}
+
+        rng = random.Random(seed)
+        size = len(self.static)
+        self.box_keys = [rng.getrandbits(64) for _ in range(size)]
+        self.player_keys = [rng.getrandbits(64) for _ in range(size)]
+
+    def lower_bound(self, boxes, box_hash):
+        # Admissible estimate of the remaining pushes: the cheapest way of
+        # assigning each box its own target. Exact for small box counts,
+        # otherwise the larger of the per-box and per-target nearest sums.
+        # With more boxes than targets some boxes never have to move, so
+        # only the per-target sum is a lower bound.
+        bound = self.bound_cache.get(box_hash)
+        if bound is not None:
+            return bound
+        tables = self.target_distances
+        if len(boxes) <= MATCHING_LIMIT and len(boxes) <= len(tables):
+            best = {0: 0}
+            for box in boxes:
+                layer = {}
+                for mask, cost in best.items():
+                    for t, table in enumerate(tables):
+                        bit = 1 << t
+                        if mask & bit:
+                            continue
+                        c = cost + table[box]
+                        if c < layer.get(mask | bit, INFINITY):
+                            layer[mask | bit] = c
+                best = layer
+            bound = min(best.values(), default=INFINITY)
+        else:
+            bound = sum(min(table[b] for b in boxes) for table in tables)
+            if len(boxes) <= len(tables):
+                dist = self.distances
+                bound = max(bound, sum(dist[b] for b in boxes))
+        bound = min(bound, INFINITY)
+        if len(self.bound_cache) < self.max_table_size:
+            self.bound_cache[box_hash] = bound
+        return bound
+
+    def _reachable(self, player, boxes):
+        static = self.static
+        seen = {player}
+        stack = [player]
+        while stack:
+            cell = stack.pop()
+            for d in self.deltas:
+                nxt = cell + d
+                if nxt not in seen and not static[nxt] & WALL and nxt not in boxes:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def solve(self, boxes=None, player=None, time_limit=None, max_nodes=None,
+              cancel=None, measure_memory=False):
+        if boxes is None:
+            boxes = self.board.box_cells
+        if player is None:
+            player = self.board.player
+        boxes = frozenset(boxes)
+
+        if measure_memory:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        try:
+            status, pushes, nodes, table_size = self._search(
+                boxes, player, start_time, time_limit, max_nodes, cancel)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            peak = 0
+            if measure_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+        solution = self._expand_pushes(boxes, player, pushes) if status == "solved" else ""
+        return SolveResult(status, solution, nodes, elapsed, peak, table_size)
+
+    def _search(self, boxes, player, start_time, time_limit, max_nodes, cancel):
+        deadlocks = self.deadlocks
+        targets = self.targets
+        static = self.static
+        deltas = self.deltas
+        box_keys = self.box_keys
+        player_keys = self.player_keys
+
+        box_hash = 0
+        for b in boxes:
+            box_hash ^= box_keys[b]
+        h = self.lower_bound(boxes, box_hash)
+        if h >= INFINITY:
+            return "unsolvable", None, 0, 0
+
+        # heap entries are (f, -g, tiebreak, node) with node being
+        # (boxes, player, box_hash, g, h, parent); parent is
+        # (parent_node, box, direction) and is only used to rebuild the solution
+        counter = 0
+        root = (boxes, player, box_hash, 0, h, None)
+        heap = [(h, 0, counter, root)]
+        table = {}
+        nodes = 0
+
+        while heap:
+            _, _, _, node = heapq.heappop(heap)
+            boxes, player, box_hash, g, h, parent = node
+
+            if targets <= boxes:
+                pushes = []
+                while parent is not None:
+                    node, box, direction = parent
+                    pushes.append((box, direction))
+                    parent = node[5]
+                pushes.reverse()
+                return "solved", pushes, nodes, len(table)
+
+            reach = self._reachable(player, boxes)
+            key = box_hash ^ player_keys[min(reach)]
+            seen_g = table.get(key)
+            if seen_g is not None and seen_g <= g:
+                continue
+            if seen_g is not None or len(table) < self.max_table_size:
+                table[key] = g
+
+            nodes += 1
+            if nodes & 1023 == 0:
+                if max_nodes is not None and nodes >= max_nodes:
+                    return "budget", None, nodes, len(table)
+                if time_limit is not None and time.perf_counter() - start_time > time_limit:
+                    return "budget", None, nodes, len(table)
+                if cancel is not None and cancel.is_set():
+                    return "cancelled", None, nodes, len(table)
+
+            for box in boxes:
+                for direction, d in enumerate(deltas):
+                    dest = box + d
+                    if box - d not in reach or static[dest] & WALL or dest in boxes:
+                        continue
+                    new_boxes = boxes - {box} | {dest}
+                    if deadlocks.is_deadlock(dest, new_boxes):
+                        continue
+                    new_hash = box_hash ^ box_keys[box] ^ box_keys[dest]
+                    new_h = self.lower_bound(new_boxes, new_hash)
+                    if new_h >= INFINITY:
+                        continue
+                    counter += 1
+                    child = (new_boxes, box, new_hash, g + 1, new_h, (node, box, direction))
+                    heapq.heappush(heap, (g + 1 + new_h, -(g + 1), counter, child))
+
+        return "unsolvable", None, nodes, len(table)
+
+    def _walk(self, start, goal, boxes):
+        # shortest player path as direction codes, avoiding boxes
+        if start == goal:
+            return []
+        static = self.static
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for direction, d in enumerate(self.deltas):
+                nxt = cell + d
+                if nxt in came_from or static[nxt] & WALL or nxt in boxes:
+                    continue
+                came_from[nxt] = (cell, direction)
+                if nxt == goal:
+                    path = []
+                    while came_from[nxt] is not None:
+                        nxt, direction = came_from[nxt]
+                        path.append(direction)
+                    path.reverse()
+                    return path
+                queue.append(nxt)
+        return None
+
+    def _expand_pushes(self, boxes, player, pushes):
+        # turn a list of (box, direction) pushes into a LURD move string,
+        # lowercase for steps and uppercase for pushes
+        boxes = set(boxes)
+        moves = []
+        for box, direction in pushes:
+            d = self.deltas[direction]
+            for step in self._walk(player, box - d, boxes):
+                moves.append(DIRECTION_CHARS[step])
+            moves.append(DIRECTION_CHARS[direction].upper())
+            boxes.remove(box)
+            boxes.add(box + d)
+            player = box
+        return "".join(moves)
+
+
+def solve(layout, **kwargs):
+    return Solver(layout).solve(**kwargs)
+
+
+def main(argv=None):
+    import argparse
+    from levels import LEVELS
+
+    parser = argparse.ArgumentParser(description="Solve the built-in Sokoban levels.")
+    parser.add_argument("--level", type=int, help="1-based level number (default: all)")
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per level")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per level")
+    parser.add_argument("--no-cache", action="store_true", help="always search, ignoring the solve cache")
+    args = parser.parse_args(argv)
+
+    from solvecache import default_cache, solve as cached_solve
+    cache = None if args.no_cache else default_cache()
+    indices = range(len(LEVELS)) if args.level is None else [args.level - 1]
+    for i in indices:
+        level = LEVELS[i]
+        result = cached_solve(level["layout"], cache, time_limit=args.time_limit, measure_memory=True)
+        if args.json:
+            print(json.dumps(dict(result.as_dict(), level=i + 1, name=level["name"])))
+        else:
+            print(f"{level['name']}: {result.status}, {result.moves} moves / {result.pushes} pushes, "
+                  f"{result.nodes} nodes, {result.elapsed * 1000:.1f} ms, "
+                  f"peak {result.peak_memory / 1024:.0f} KiB{' (cached)' if result.cached else ''}")
+            if result.solved:
+                print(f"  {result.solution}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Sprite atlas for the Sokoban board.
+
+The character art, the wall texture and the procedurally drawn box and
+target tiles are packed into one surface that is converted to the display
+format once. Sprites are handed out pre-scaled for a tile size and the
+scaled copies are cached, so drawing a tile is a single blit.
+"""
+
+import os
+
+import pygame
+
+CHARACTER_FILES = {
+    "player_up": os.path.join("Character", "back-character.png"),
+    "player_down": os.path.join("Character", "front-character.png"),
+    "player_left": os.path.join("Character", "left-character.png"),
+    "player_right": os.path.join("Character", "right-character.png"),
+}
+# Same lookup order the game has always used for the wall texture.
+WALL_FILES = ["walls.jpg", os.path.join("assets", "wall.png"), os.path.join("assets", "walls.png")]
+
+# indexed by board direction code (up, down, left, right)
+PLAYER_SPRITES = ("player_up", "player_down", "player_left", "player_right")
+
+BOX_COLOR = (255, 180, 100)
+BOX_ON_TARGET_COLOR = (255, 200, 100)
+BOX_EDGE_COLOR = (101, 67, 33)
+TARGET_COLOR = (100, 255, 100)
+TARGET_INNER_COLOR = (50, 200, 50)
+ATLAS_WIDTH = 2048
+
+
+def clear_background(image, tolerance=12):
+    # The character art ships on an opaque white canvas; make the white
+    # region connected to the corner transparent so the floor shows through.
+    image = image.convert_alpha() if pygame.display.get_surface() else image.copy()
+    white = pygame.mask.from_threshold(image, (255, 255, 255, 255), (tolerance, tolerance, tolerance, 255))
+    if not white.get_at((0, 0)):
+        return image
+    white.connected_component((0, 0)).to_surface(image, setcolor=(0, 0, 0, 0), unsetcolor=None)
+    return image
+
+
+def art_files():
+    return list(CHARACTER_FILES.values()) + WALL_FILES
+
+
+def load_art(load_image):
+    """Collect the art that exists via load_image(relative_path); returns {name: surface}."""
+    images = {}
+    for name, path in CHARACTER_FILES.items():
+        image = load_image(path)
+        if image is not None:
+            images[name] = clear_background(image)
+    for path in WALL_FILES:
+        image = load_image(path)
+        if image is not None:
+            images["wall"] = image
+            break
+    return images
+
+
+def draw_box_tile(size, color):
+    tile = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.rect(tile, color, (4, 4, size - 8, size - 8), border_radius=5)
+    pygame.draw.rect(tile, BOX_EDGE_COLOR, (4, 4, size - 8, size - 8), 3, border_radius=5)
+    pygame.draw.line(tile, BOX_EDGE_COLOR, (10, 10), (size - 10, size - 10), 2)
+    pygame.draw.line(tile, BOX_EDGE_COLOR, (size - 10, 10), (10, size - 10), 2)
+    return tile
+
+
+def draw_target_tile(size):
+    tile = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.rect(tile, TARGET_COLOR, (5, 5, size - 10, size - 10), border_radius=5)
+    pygame.draw.rect(tile, TARGET_INNER_COLOR, (10, 10, size - 20, size - 20), border_radius=3)
+    return tile
+
+
+class SpriteAtlas:
+    def __init__(self, images, tile_size):
+        sprites = dict(images)
+        sprites["box"] = draw_box_tile(tile_size, BOX_COLOR)
+        sprites["box_on_target"] = draw_box_tile(tile_size, BOX_ON_TARGET_COLOR)
+        sprites["target"] = draw_target_tile(tile_size)
+
+        # simple shelf packing, tallest first
+        placements = {}
+        x = y = shelf_height = width = 0
+        for name, image in sorted(sprites.items(), key=lambda item: -item[1].get_height()):
+            w, h = image.get_size()
+            if x + w > ATLAS_WIDTH:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            placements[name] = pygame.Rect(x, y, w, h)
+            x += w
+            width = max(width, x)
+            shelf_height = max(shelf_height, h)
+
+        atlas = pygame.Surface((max(width, 1), max(y + shelf_height, 1)), pygame.SRCALPHA)
+        for name, rect in placements.items():
+            atlas.blit(sprites[name], rect)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        self.surface = atlas
+        self.regions = placements
+        self.scaled = {}
+
+    def __contains__(self, name):
+        return name in self.regions
+
+    def get(self, name, size):
+        """The named sprite fitted into a size x size square (aspect kept), or None."""
+        key = (name, size)
+        sprite = self.scaled.get(key)
+        if sprite is None:
+            region = self.regions.get(name)
+            if region is None:
+                return None
+            sprite = self.surface.subsurface(region)
+            if region.size != (size, size):
+                # walls fill the whole tile, everything else keeps its shape
+                if name == "wall":
+                    target = (size, size)
+                else:
+                    scale = min(size / region.width, size / region.height)
+                    target = (max(1, round(region.width * scale)), max(1, round(region.height * scale)))
+                sprite = pygame.transform.smoothscale(sprite, target)
+            self.scaled[key] = sprite
+        return sprite
+
+    def blit(self, surface, name, rect):
+        """Blit the sprite centred in rect; returns False if the atlas lacks it."""
+        sprite = self.get(name, rect.width)
+        if sprite is None:
+            return False
+        surface.blit(sprite, sprite.get_rect(center=rect.center))
+        return True
@@ -0,0 +1,78 @@
+import pytest
+
+from circuit import Circuit, Simulator
+from gates import GATE_NAMES, output_at, truth_table, truth_table_rows
+
+EXPRESSIONS = [
+    "A AND B",
+    "NOT A",
+    "(A AND B) XOR NOT C",
+    "A NAND (B NOR C) OR D",
+    "(A XNOR B) AND (C OR 1)",
+    "NOT (A XOR B XOR C XOR D) AND NOT E",
+]
+
+
+def check_against_truth_table(expression):
+    variables, column = truth_table(expression)
+    sim = Simulator(Circuit.from_expression(expression))
+    n = len(variables)
+    for row in range(1 << n):
+        for i, name in enumerate(variables):
+            sim.set_input(name, (row >> (n - 1 - i)) & 1)
+        assert sim.propagate()
+        assert sim.value("Y") == output_at(column, row), (expression, row)
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_matches_truth_table(expression):
+    check_against_truth_table(expression)
+
+
+@pytest.mark.parametrize("gate", GATE_NAMES)
+def test_single_gates(gate):
+    check_against_truth_table("NOT A" if gate == "NOT" else f"A {gate} B")
+
+
+def test_toggle_only_touches_fanout():
+    circuit = Circuit()
+    a = circuit.add_input("A")
+    b = circuit.add_input("B")
+    circuit.add_gate("AND", (a, b), "Y")
+    circuit.add_gate("OR", (b, b), "Z")
+    sim = Simulator(circuit)
+    before = sim.evaluations
+    assert sim.toggle("A")
+    assert sim.evaluations == before + 1
+    assert sim.value("Y") == 0
+
+
+def test_oscillating_loop_is_stopped():
+    circuit = Circuit()
+    enable = circuit.add_input("EN")
+    out = circuit.add_gate("NAND", (enable, enable), "Y")
+    circuit.connect(0, 1, out)
+    sim = Simulator(circuit)
+    assert not sim.toggle("EN")
+    assert not sim.settled
+
+
+def test_inputs_driven_by_gates_are_rejected():
+    sim = Simulator(Circuit.from_expression("A AND B"))
+    with pytest.raises(ValueError):
+        sim.set_input("Y", 1)
+
+
+def test_truth_table_rows():
+    rows = truth_table_rows(*truth_table("(A AND B) XOR NOT C"))
+    assert rows[0] == ("A", "B", "C", "Y")
+    assert list(rows[1:]) == [(a, b, c, str(int(a == b == "1") ^ (c == "0")))
+                              for a in "01" for b in "01" for c in "01"]
+    assert rows[-1] == rows[8]
+
+
+def test_wide_truth_table_rows():
+    rows = truth_table_rows(*truth_table(" XOR ".join("ABCDEFGHIJKLMNOPQRST")))
+    assert len(rows) == (1 << 20) + 1
+    assert rows[-1] == ("1",) * 20 + ("0",)
+    assert rows[0b1011 + 1][-5:] == ("1", "0", "1", "1", "1")
@@ -0,0 +1,50 @@
+import pytest
+
+from board import layout_hash
+from levels import LEVELS
+from replay import HEADER, Replay, Verifier, pack_moves, unpack_moves
+from solver import Solver
+
+LAYOUT = LEVELS[0]["layout"]
+
+
+def solved_replay(timestamp=1_700_000_000):
+    solution = Solver(LAYOUT).solve().solution
+    return Replay(layout_hash(LAYOUT), ["udlr".index(c.lower()) for c in solution], timestamp)
+
+
+@pytest.mark.parametrize("count", [0, 1, 3, 4, 5, 17])
+def test_pack_unpack(count):
+    directions = bytes(i * 7 % 4 for i in range(count))
+    packed = pack_moves(directions)
+    assert len(packed) == (count + 3) // 4
+    assert unpack_moves(packed, count) == directions
+
+
+def test_save_load_round_trip(tmp_path):
+    replay = solved_replay()
+    path = replay.save(str(tmp_path))
+    data = open(path, "rb").read()
+    assert len(data) == HEADER.size + (len(replay.directions) + 3) // 4
+    loaded = Replay.load(path)
+    assert loaded.level_hash == replay.level_hash
+    assert loaded.timestamp == replay.timestamp
+    assert loaded.directions == replay.directions
+    assert Verifier(LEVELS).verify(loaded) == "valid"
+
+
+def test_save_never_overwrites(tmp_path):
+    paths = [solved_replay().save(str(tmp_path)) for _ in range(3)]
+    assert len(set(paths)) == 3
+    assert all(Replay.load(path).directions == solved_replay().directions for path in paths)
+
+
+def test_bad_files(tmp_path):
+    path = tmp_path / "broken.lgr"
+    path.write_bytes(solved_replay().to_bytes()[:-1])
+    verifier = Verifier(LEVELS)
+    assert verifier.verify_file(str(path)) == "corrupt"
+    path.write_bytes(b"nope" * 10)
+    assert verifier.verify_file(str(path)) == "corrupt"
+    assert verifier.verify(Replay(b"\0" * 8, [])) == "unknown-level"
+    assert verifier.verify(Replay(layout_hash(LAYOUT), [0])) == "invalid"
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+from server import MAX_LINE, GameServer, encode
+
+LEVELS = [
+    {"name": "One push", "gate": "AND", "layout": ["#####", "#@$.#", "#####"]},
+    {"name": "No player", "gate": "OR", "layout": ["#####", "# $.#", "#####"]},
+    {"name": "No gate", "layout": ["#####", "#@$.#", "#####"]},
+]
+
+
+async def exchange(requests):
+    server = GameServer(LEVELS)
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0, limit=MAX_LINE)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+    replies = []
+    try:
+        for request, count in requests:
+            writer.write(encode(request) if isinstance(request, dict) else request)
+            await writer.drain()
+            replies.append([json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in range(count)])
+    finally:
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+    return replies
+
+
+def test_play_a_level():
+    welcome, level, blocked, push = asyncio.run(exchange([
+        ({"type": "hello", "name": "Ana"}, 1),
+        ({"type": "start", "level": 0}, 1),
+        ({"type": "move", "dir": 0}, 1),
+        ({"type": "move", "dir": 3}, 2),
+    ]))
+    assert welcome == [{"type": "welcome", "session": 1, "levels": 3}]
+    assert level[0]["type"] == "level"
+    assert level[0]["layout"] == LEVELS[0]["layout"]
+    assert blocked == [{"type": "delta", "op": "none"}]
+    delta, quiz = push
+    assert delta == {"type": "delta", "op": "move", "code": 3 | 4, "moves": 1}
+    assert quiz["type"] == "quiz"
+    assert quiz["gate"] == "AND"
+    assert "answer" not in quiz
+
+
+def test_bad_requests_keep_the_connection():
+    replies = asyncio.run(exchange([
+        ({"type": "move", "dir": 0}, 1),
+        (b"not json\n", 1),
+        ({"type": "hello", "name": "Ana"}, 1),
+        ({"type": "hello", "name": "Ana"}, 1),
+        ({"type": "start", "level": True}, 1),
+        ({"type": "start", "level": 1}, 1),
+        ({"type": "start", "level": 2}, 1),
+        ({"type": "start", "level": 0}, 1),
+        ({"type": "move", "dir": True}, 1),
+    ]))
+    errors = [reply[0]["error"] for reply in replies if reply[0]["type"] == "error"]
+    assert errors == ["say hello first", "bad request", "already said hello", "no such level", "level cannot be played: no player",
+                      "start failed"]
+    assert replies[-2][0]["type"] == "level"
+    assert replies[-1] == [{"type": "delta", "op": "none"}]
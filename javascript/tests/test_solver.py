@@ -0,0 +1,51 @@
+import pytest
+
+from core import SokobanRules
+from levels import LEVELS
+from solver import Solver
+
+SPARE_BOX = ["######", "#$   #", "#@$ .#", "#    #", "######"]
+
+
+def replay(layout, solution):
+    rules = SokobanRules(0, [{"name": "test", "gate": "AND", "layout": layout}])
+    for move in solution:
+        assert rules.apply_move("udlr".index(move.lower()))
+    return rules
+
+
+@pytest.mark.parametrize("index", range(len(LEVELS)))
+def test_shipped_levels_solve(index):
+    layout = LEVELS[index]["layout"]
+    result = Solver(layout).solve(time_limit=30.0)
+    assert result.solved
+    assert replay(layout, result.solution).check_win()
+
+
+def test_spare_box_is_not_a_deadlock():
+    result = Solver(SPARE_BOX).solve()
+    assert result.status == "solved"
+    assert result.pushes == 2
+    assert replay(SPARE_BOX, result.solution).check_win()
+
+
+def test_spare_box_in_corner_does_not_warn():
+    layout = ["#######", "#  $  #", "#@ $ .#", "#     #", "#######"]
+    # walk round and push the top box into the top-left corner
+    rules = replay(layout, "drrruuLL")
+    assert not rules.deadlocked
+    board = rules.board
+    assert Solver(layout).solve(board.box_cells, board.player).solved
+
+
+def test_box_in_corner_is_unsolvable():
+    result = Solver(["#####", "#@ $#", "#.  #", "#####"]).solve()
+    assert result.status == "unsolvable"
+
+
+def test_deadlock_warning_with_one_box_per_target():
+    rules = SokobanRules(0, [{"name": "test", "gate": "AND", "layout": ["#####", "#@$ #", "#  .#", "#####"]}])
+    rules.apply_move(3)
+    assert rules.deadlocked
+    rules.undo()
+    assert not rules.deadlocked
@@ -0,0 +1,75 @@
+import io
+import json
+import multiprocessing
+import os
+
+import pytest
+
+import validate
+from levels import LEVELS
+from validate import iter_pack, run, validate_level
+
+SMALL = {"name": "Small", "gate": "AND", "layout": ["#####", "#@$.#", "#####"]}
+NO_PLAYER = {"name": "No player", "gate": "OR", "layout": ["#####", "# $.#", "#####"]}
+
+
+_validate_level = validate_level
+
+
+def _crashing(index, level, *args):
+    if level["name"] == "crash":
+        os._exit(1)
+    return _validate_level(index, level, *args)
+
+
+def records(levels, **kwargs):
+    out = io.StringIO()
+    counts = run(levels, out, workers=2, use_cache=False, **kwargs)
+    return counts, sorted((json.loads(line) for line in out.getvalue().splitlines()), key=lambda r: r["index"])
+
+
+def test_iter_pack_default_is_shipped_levels():
+    assert list(iter_pack(None)) == list(LEVELS)
+
+
+def test_iter_pack_json_and_jsonl(tmp_path):
+    levels = [SMALL, NO_PLAYER]
+    json_path = tmp_path / "pack.json"
+    json_path.write_text(json.dumps(levels), encoding="utf-8")
+    jsonl_path = tmp_path / "pack.jsonl"
+    jsonl_path.write_text(json.dumps(SMALL) + "\n\n" + json.dumps(NO_PLAYER) + "\n", encoding="utf-8")
+    assert list(iter_pack(str(json_path))) == levels
+    assert list(iter_pack(str(jsonl_path))) == levels
+
+
+def test_iter_pack_xsb(tmp_path):
+    path = tmp_path / "pack.xsb"
+    path.write_text("; collection\n\n#####\n#@$.#\n#####\nTitle: First\n\n"
+                    "######\n#@-$.#\n######\n", encoding="utf-8")
+    levels = list(iter_pack(str(path)))
+    assert [level["name"] for level in levels] == ["First", "pack #2"]
+    assert levels[0]["layout"] == ["#####", "#@$.#", "#####"]
+    assert levels[1]["layout"] == ["######", "#@ $.#", "######"]
+    assert all(level["gate"] for level in levels)
+
+
+def test_malformed_levels_are_reported():
+    assert validate_level(0, NO_PLAYER, 5.0, 10_000, use_cache=False)["status"] == "error"
+    counts, report = records([SMALL, NO_PLAYER, "junk", dict(SMALL, layout=["#####", "#@$ #", "#####"])])
+    assert counts == {"solvable": 1, "error": 3}
+    assert [r["status"] for r in report] == ["solvable", "error", "error", "error"]
+    assert report[1]["error"] == "no player"
+    assert report[3]["error"] == "no targets"
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="needs forked workers")
+def test_dead_worker_does_not_stop_the_pack(monkeypatch):
+    monkeypatch.setattr(validate, "validate_level", _crashing)
+    levels = [dict(SMALL, name=name) for name in ("before", "crash")]
+    out = io.StringIO()
+    run(levels + [dict(SMALL, name=f"after {i}") for i in range(12)], out, workers=1, use_cache=False)
+    report = {r["name"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert len(report) == 14
+    assert report["crash"]["status"] == "error"
+    # levels submitted after the pool was replaced are solved normally
+    assert report["after 11"]["status"] == "solvable"
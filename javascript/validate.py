@@ -0,0 +1,187 @@
+"""Batch validator for level packs.
+
+Solves every level of a pack on a process pool (one worker per core by
+default) and streams one JSON line per level as soon as it finishes, so
+memory use stays flat no matter how large the pack is. Only a small window
+of levels is in flight at any time. A level that cannot be played (no
+player, fewer boxes than targets) or that makes the solver fail, and the
+levels in flight when a worker process dies, are reported with status
+"error" and the run carries on.
+
+Usage:
+    python validate.py                         # the shipped LEVELS
+    python validate.py pack.json -o report.jsonl
+    python validate.py pack.jsonl --time-limit 10 --memory-mb 512
+
+A pack is a JSON list of level dicts in the LEVELS format, a .jsonl file
+with one such dict per line, or an .xsb/.sok collection read via levelpack.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
+
+from board import layout_problem
+
+
+def iter_pack(path):
+    if path is None:
+        from levels import LEVELS
+        yield from LEVELS
+    elif path.lower().endswith((".xsb", ".sok", ".txt")):
+        from levelpack import LevelPack
+        yield from LevelPack(path)
+    elif path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def _limit_memory(memory_mb):
+    # Best effort: RLIMIT_AS only exists on Unix-like systems.
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def level_problem(level):
+    """Why a pack entry cannot be played, or None if it can."""
+    if not isinstance(level, dict) or "layout" not in level:
+        return "not a level dict with a layout"
+    return layout_problem(level["layout"])
+
+
+def _record(index, level):
+    name = level.get("name") if isinstance(level, dict) else None
+    return {"index": index, "name": name or f"Level {index + 1}"}
+
+
+def validate_level(index, level, time_limit, max_table_size, use_cache=True):
+    from solvecache import default_cache, solve
+
+    record = _record(index, level)
+    problem = level_problem(level)
+    if problem is not None:
+        record.update(status="error", error=problem)
+        return record
+    start = time.perf_counter()
+    cache = default_cache() if use_cache else None
+    try:
+        result = solve(level["layout"], cache, max_table_size=max_table_size, time_limit=time_limit)
+    except MemoryError:
+        record.update(status="memory", elapsed=round(time.perf_counter() - start, 3))
+        return record
+    except Exception as e:
+        # one bad level must not stop the rest of the pack
+        record.update(status="error", error=f"{type(e).__name__}: {e}",
+                      elapsed=round(time.perf_counter() - start, 3))
+        return record
+    status = {"solved": "solvable", "unsolvable": "unsolvable"}.get(result.status, "timeout")
+    record.update(status=status, elapsed=round(result.elapsed, 3), nodes=result.nodes)
+    if result.cached:
+        record["cached"] = True
+    if result.solved:
+        record.update(moves=result.moves, pushes=result.pushes, solution=result.solution)
+    return record
+
+
+def run(levels, out, workers=None, time_limit=30.0, memory_mb=None, max_table_size=2_000_000, use_cache=True):
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    counts = {}
+    initializer = _limit_memory if memory_mb else None
+    initargs = (memory_mb,) if memory_mb else ()
+
+    def write(record):
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+        out.write(json.dumps(record) + "\n")
+
+    def died(index, level):
+        return dict(_record(index, level), status="error", error="worker process died")
+
+    pool = None
+    # future -> (index, level), so a level lost with its worker can still be reported
+    pending = {}
+    levels = enumerate(levels)
+    exhausted = False
+    try:
+        while pending or not exhausted:
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+            broken = False
+            while not exhausted and len(pending) < window:
+                try:
+                    index, level = next(levels)
+                except StopIteration:
+                    exhausted = True
+                    break
+                try:
+                    future = pool.submit(validate_level, index, level, time_limit, max_table_size, use_cache)
+                except BrokenProcessPool:
+                    # submit it again on the next pool
+                    levels = chain([(index, level)], levels)
+                    broken = True
+                    break
+                pending[future] = (index, level)
+            if pending and not broken:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, level = pending.pop(future)
+                    try:
+                        write(future.result())
+                    except BrokenProcessPool:
+                        write(died(index, level))
+                        broken = True
+            if broken:
+                # a dead worker takes the whole pool down with it: report
+                # everything still in flight and carry on with a new pool
+                for index, level in pending.values():
+                    write(died(index, level))
+                pending.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = None
+            out.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that every level in a pack is solvable.")
+    parser.add_argument("pack", nargs="?", help="JSON or JSONL level pack (default: shipped LEVELS)")
+    parser.add_argument("-o", "--output", help="write the JSONL report here instead of stdout")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--time-limit", type=float, default=30.0, help="seconds per level")
+    parser.add_argument("--memory-mb", type=int, default=None, help="address space limit per worker")
+    parser.add_argument("--no-cache", action="store_true", help="solve every level, ignoring the solve cache")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    try:
+        counts = run(iter_pack(args.pack), out, args.workers, args.time_limit, args.memory_mb,
+                     use_cache=not args.no_cache)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"{sum(counts.values())} levels in {time.perf_counter() - start:.1f}s: {summary}", file=sys.stderr)
+    return 0 if set(counts) <= {"solvable"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())